@@ -0,0 +1,131 @@
+import os
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from . import models
+
+# 관리자 통계용 일별 집계(rollup) 갱신 함수 모음.
+# 원본 행을 쓰는 같은 트랜잭션 안에서 호출하며, commit은 호출자가 수행한다.
+# 집계가 어긋나더라도 rebuild_rollups()(주기 작업)가 원본 테이블 기준으로 다시 맞춘다.
+
+# 집계 행의 날짜(day)와 통계 API의 조회 기간은 모두 이 시간대의 날짜 기준
+STATS_TIMEZONE = ZoneInfo(os.getenv("STATS_TIMEZONE", "Asia/Seoul"))
+
+# 시간대 정보가 없는(naive) 값을 해석하는 기준 (SQLite는 저장 시 시간대 정보를 버림)
+# - rentals.created_at: DB 기본값(CURRENT_TIMESTAMP)으로 채워지므로 UTC
+# - chat_messages.timestamp: 채팅 라우터가 KST 현재 시각으로 채움
+RENTAL_NAIVE_TIMEZONE = timezone.utc
+CHAT_NAIVE_TIMEZONE = ZoneInfo("Asia/Seoul")
+
+
+def stats_day(value: datetime = None, naive_tz=timezone.utc) -> date:
+    """시각을 STATS_TIMEZONE 기준 날짜로 변환 (value가 없으면 현재 날짜)"""
+    if value is None:
+        value = datetime.now(timezone.utc)
+    elif value.tzinfo is None:
+        value = value.replace(tzinfo=naive_tz)
+    return value.astimezone(STATS_TIMEZONE).date()
+
+
+def _increment(db: Session, model, keys: dict, increments: dict):
+    """keys에 해당하는 집계 행의 카운터를 증가 (없으면 생성). SQLite/Postgres는 단일 UPSERT 문으로 처리"""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        table = model.__table__
+        stmt = insert(table).values(**keys, **increments)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + stmt.excluded[name] for name in increments}
+        )
+        db.execute(stmt)
+        return
+
+    row = db.query(model).filter_by(**keys).with_for_update().first()
+    if row is None:
+        db.add(model(**keys, **increments))
+    else:
+        for name, value in increments.items():
+            setattr(row, name, (getattr(row, name) or 0) + value)
+
+
+def record_rental_requested(db: Session, equip_id: int, day: date = None):
+    _increment(db, models.DailyRentalStats,
+               {"day": day or stats_day(), "equip_id": equip_id},
+               {"requested": 1, "pending": 1, "approved": 0})
+
+
+def record_rental_approved(db: Session, rental: models.Rental):
+    # 신청일 기준으로 집계하므로 해당 날짜 행의 pending -> approved로 이동
+    day = stats_day(rental.created_at, RENTAL_NAIVE_TIMEZONE)
+    pending = db.query(models.DailyRentalStats.pending).filter(
+        models.DailyRentalStats.day == day,
+        models.DailyRentalStats.equip_id == rental.equip_id
+    ).with_for_update().scalar()
+    if pending:
+        increments = {"requested": 0, "pending": -1, "approved": 1}
+    else:
+        # 집계 이전에 들어온 신청이면 옮길 pending이 없으므로 신청/승인을 함께 기록 (음수 방지)
+        increments = {"requested": 1, "pending": 0, "approved": 1}
+    _increment(db, models.DailyRentalStats, {"day": day, "equip_id": rental.equip_id}, increments)
+
+
+def record_chat_message(db: Session, timestamp: datetime = None):
+    _increment(db, models.DailyChatStats,
+               {"day": stats_day(timestamp, CHAT_NAIVE_TIMEZONE)},
+               {"message_count": 1})
+
+
+def rebuild_rollups(db: Session):
+    """
+    rentals / chat_messages 원본 테이블을 기준으로 집계 테이블 전체를 다시 계산.
+    DB의 date()는 세션 시간대를 따르므로, 증분 갱신과 같은 날짜가 나오도록 시각을 읽어와 stats_day()로 변환한다.
+    """
+    # 원본을 읽은 뒤 지우기 전에 커밋된 증분 갱신이 사라지지 않도록, 집계 테이블 쓰기를 먼저 막고 나서 읽음.
+    # Postgres는 테이블 잠금(동시 UPSERT는 이 트랜잭션이 끝날 때까지 대기),
+    # SQLite는 DELETE로 쓰기 잠금을 먼저 잡으면 다른 쓰기 트랜잭션이 커밋할 수 없음
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(
+            f"LOCK TABLE {models.DailyRentalStats.__tablename__}, {models.DailyChatStats.__tablename__} IN EXCLUSIVE MODE"
+        ))
+    db.query(models.DailyRentalStats).delete(synchronize_session=False)
+    db.query(models.DailyChatStats).delete(synchronize_session=False)
+
+    rental_stats = {}
+    for created_at, equip_id, rental_status in db.query(
+        models.Rental.created_at, models.Rental.equip_id, models.Rental.status
+    ).yield_per(10000):
+        if created_at is None:
+            continue
+        day = stats_day(created_at, RENTAL_NAIVE_TIMEZONE)
+        stats = rental_stats.setdefault((day, equip_id), {"requested": 0, "pending": 0, "approved": 0})
+        stats["requested"] += 1
+        if rental_status == models.RentalStatus.PENDING:
+            stats["pending"] += 1
+        elif rental_status == models.RentalStatus.APPROVED:
+            stats["approved"] += 1
+
+    chat_stats = {}
+    for (timestamp,) in db.query(models.ChatMessage.timestamp).yield_per(10000):
+        if timestamp is None:
+            continue
+        day = stats_day(timestamp, CHAT_NAIVE_TIMEZONE)
+        chat_stats[day] = chat_stats.get(day, 0) + 1
+
+    db.bulk_insert_mappings(models.DailyRentalStats, [
+        {"day": day, "equip_id": equip_id, **stats} for (day, equip_id), stats in rental_stats.items()
+    ])
+    db.bulk_insert_mappings(models.DailyChatStats, [
+        {"day": day, "message_count": count} for day, count in chat_stats.items()
+    ])
+
+
+def rollups_empty(db: Session) -> bool:
+    """집계 테이블이 비어 있는지 (집계 도입 이전 데이터를 채워야 하는지 판단)"""
+    return (db.query(models.DailyRentalStats.id).first() is None
+            and db.query(models.DailyChatStats.day).first() is None)
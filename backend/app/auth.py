@@ -1,21 +1,31 @@
 import os
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status, Query, WebSocketException
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from . import models, database
+from . import models, schemas, database
+from .revocation import token_versions
 
 # --- 설정 (배포 시 환경변수로 관리 권장) ---
 # 실제 운영에선 os.getenv("SECRET_KEY") 사용, 개발 시 기본값 제공
 SECRET_KEY = os.getenv("SECRET_KEY", "your-super-secret-key-please-change-me")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# 액세스 토큰은 짧게, 만료되면 리프레시 토큰으로 재발급
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
 # 비밀번호 해싱 컨텍스트 (Bcrypt 사용)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib/bcrypt, jose는 import 비용이 커서 처음 사용할 때 로드 (콜드 스타트 단축)
+_pwd_context = None
+
+def get_pwd_context():
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
 
 # 토큰 인증 방식 설정 (Header: Authorization: Bearer <token>)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/login")
@@ -24,51 +34,115 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/login")
 
 def verify_password(plain_password, hashed_password):
     """입력된 비밀번호와 저장된 해시 비밀번호 비교"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     """비밀번호 해싱"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None, token_type: str = "access"):
     """JWT 액세스 토큰 생성"""
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "type": token_type})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-# --- 의존성 (Dependency) ---
+def create_token_pair(user: models.User, db: Session) -> dict:
+    """
+    액세스/리프레시 토큰을 함께 발급.
+    토큰에 사용자 버전(ver)을 넣어두고, 버전이 오르면(비밀번호 변경, 로그아웃) 이전 토큰은 모두 무효가 됨.
+    """
+    data = {
+        "sub": user.username,
+        "uid": user.user_id,
+        "role": user.role,
+        "ver": token_versions.fetch(db, user.user_id),
+    }
+    return {
+        "access_token": create_access_token(data, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)),
+        # 리프레시 토큰은 jti로 한 번만 사용 가능 (revocation.use_refresh_token)
+        "refresh_token": create_access_token({**data, "jti": uuid.uuid4().hex},
+                                             timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS), token_type="refresh"),
+        "token_type": "bearer",
+        "role": user.role,
+    }
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+def decode_token(token: str, token_type: str = "access") -> Optional[dict]:
     """
-    API 요청 시 헤더의 토큰을 검사하여 현재 로그인한 유저 객체를 반환.
-    라우터 함수에서 current_user: models.User = Depends(get_current_user) 형태로 사용.
+    토큰 서명/만료/종류/폐기 여부를 검사하고 payload를 반환 (유효하지 않으면 None).
+    폐기 여부는 메모리의 사용자 버전과 비교하므로 DB 조회가 없음.
     """
-    credentials_exception = HTTPException(
+    from jose import JWTError, jwt
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("type") != token_type or payload.get("sub") is None or payload.get("uid") is None:
+        return None
+    if not token_versions.is_current(payload["uid"], payload.get("ver", 0)):
+        return None
+    return payload
+
+# --- 의존성 (Dependency) ---
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="자격 증명을 검증할 수 없습니다.",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+
+def get_current_claims(token: str = Depends(oauth2_scheme)) -> schemas.TokenData:
+    """
+    DB 조회 없이 토큰의 정보(user_id, username, role)만 필요한 경우 사용.
+    라우터 함수에서 claims: schemas.TokenData = Depends(get_current_claims) 형태로 사용.
+    """
+    payload = decode_token(token)
+    if payload is None:
+        raise _credentials_exception()
+    return schemas.TokenData(username=payload["sub"], user_id=payload["uid"], role=payload.get("role"))
+
+def require_admin(claims: schemas.TokenData = Depends(get_current_claims)) -> schemas.TokenData:
+    """관리자 전용 엔드포인트용. 역할은 토큰에 들어 있으므로 사용자 테이블을 조회하지 않음"""
+    if claims.role != models.UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다.")
+    return claims
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+    """
+    API 요청 시 헤더의 토큰을 검사하여 현재 로그인한 유저 객체를 반환.
+    라우터 함수에서 current_user: models.User = Depends(get_current_user) 형태로 사용.
+    """
+    payload = decode_token(token)
+    if payload is None:
+        raise _credentials_exception()
         
-    user = db.query(models.User).filter(models.User.username == username).first()
+    user = db.get(models.User, payload["uid"])
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
         
     return user
 
+def get_claims_from_token_query(token: str = Query(...)) -> schemas.TokenData:
+    """
+    WebSocket 연결 시 쿼리 파라미터의 토큰만 검사 (DB 세션 없음).
+    연결이 오래 유지되는 소켓에서 get_user_from_token_query를 쓰면 연결 내내 커넥션 풀의 연결을 점유하므로,
+    사용자 정보가 필요 없는 소켓(알림 등)은 이것을 사용.
+    """
+    payload = decode_token(token)
+    if payload is None:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION,
+            reason="자격 증명을 검증할 수 없습니다.",
+        )
+    return schemas.TokenData(username=payload["sub"], user_id=payload["uid"], role=payload.get("role"))
+
 def get_user_from_token_query(token: str = Query(...), db: Session = Depends(database.get_db)):
     """
     WebSocket 연결 시 쿼리 파라미터의 토큰을 검사하여 현재 로그인한 유저 객체를 반환.
@@ -78,16 +152,12 @@ def get_user_from_token_query(token: str = Query(...), db: Session = Depends(dat
         reason="자격 증명을 검증할 수 없습니다.",
     )
     
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
+    payload = decode_token(token)
+    if payload is None:
         raise credentials_exception
         
-    user = db.query(models.User).filter(models.User.username == username).first()
+    user = db.get(models.User, payload["uid"])
     if user is None:
         raise credentials_exception
         
-    return user
\ No newline at end of file
+    return user
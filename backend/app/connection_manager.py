@@ -1,41 +1,103 @@
-from typing import Dict, List, Set
+import asyncio
+import json
+import logging
+from typing import Dict, Optional, Set, Tuple
 from fastapi import WebSocket
 
+logger = logging.getLogger(__name__)
+
+
 class ConnectionManager:
-    """Manages WebSocket connections for chat rooms based on rental_id."""
+    """
+    WebSocket 전달 허브.
+    채팅방(rental_id)별, 사용자(user_id)별 인덱스를 함께 유지하므로
+    방 브로드캐스트와 사용자 대상 전송(여러 방/여러 소켓)을 모두 O(1) 조회로 처리한다.
+    """
     def __init__(self):
-        # A dictionary to hold active connections for each chat room (rental_id).
-        # The key is the rental_id (as a string), and the value is a set of WebSockets.
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
+        # rental_id(str) -> 해당 방에 연결된 소켓들
+        self.rooms: Dict[str, Set[WebSocket]] = {}
+        # user_id(str) -> 해당 사용자의 모든 소켓 (방 소속 여부와 무관)
+        self.users: Dict[str, Set[WebSocket]] = {}
+        # 소켓 -> (rental_id, user_id). disconnect 시 양쪽 인덱스에서 제거하기 위함
+        self.sockets: Dict[WebSocket, Tuple[Optional[str], Optional[str]]] = {}
+        # 축약(compact) 메시지 형식을 요청한 소켓들
+        self.compact_sockets: Set[WebSocket] = set()
+        # 동기 코드(작업 큐 스레드)에서 전송을 예약하기 위한 이벤트 루프
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
-    async def connect(self, websocket: WebSocket, rental_id: str):
-        """Accepts a new WebSocket connection and adds it to the appropriate room."""
+    async def connect(self, websocket: WebSocket, rental_id: Optional[str] = None, user_id: Optional[str] = None,
+                      compact: bool = False):
+        """소켓을 수락하고 방/사용자 인덱스에 등록. rental_id 없이 연결하면 알림 전용 소켓."""
         await websocket.accept()
-        if rental_id not in self.active_connections:
-            self.active_connections[rental_id] = set()
-        self.active_connections[rental_id].add(websocket)
-        print(f"WebSocket connected to rental_id: {rental_id}. Total connections for this room: {len(self.active_connections[rental_id])}")
-
-    def disconnect(self, websocket: WebSocket, rental_id: str):
-        """Removes a WebSocket connection from a room."""
-        if rental_id in self.active_connections:
-            self.active_connections[rental_id].remove(websocket)
-            # If the room is empty, remove it from the dictionary
-            if not self.active_connections[rental_id]:
-                del self.active_connections[rental_id]
-        print(f"WebSocket disconnected from rental_id: {rental_id}.")
-
-    async def broadcast(self, message: str, rental_id: str):
-        """Broadcasts a message to all connected clients in a specific room."""
-        if rental_id in self.active_connections:
-            # Create a list of connections to iterate over to avoid issues with changing the set size during iteration
-            for connection in list(self.active_connections[rental_id]):
-                try:
-                    await connection.send_text(message)
-                except RuntimeError as e:
-                    print(f"Error broadcasting to websocket for rental_id {rental_id}: {e}")
-                    # Optionally remove the broken connection
-                    self.active_connections[rental_id].remove(connection)
+        self._loop = asyncio.get_running_loop()
+        self.sockets[websocket] = (rental_id, user_id)
+        if compact:
+            self.compact_sockets.add(websocket)
+        if rental_id is not None:
+            self.rooms.setdefault(rental_id, set()).add(websocket)
+        if user_id is not None:
+            self.users.setdefault(user_id, set()).add(websocket)
+        logger.info(f"WebSocket connected (rental_id={rental_id}, user_id={user_id}). Total connections: {len(self.sockets)}")
+
+    def disconnect(self, websocket: WebSocket, rental_id: Optional[str] = None):
+        """소켓을 모든 인덱스에서 제거. (rental_id 인자는 이전 호출 방식과의 호환용)"""
+        room_id, user_id = self.sockets.pop(websocket, (rental_id, None))
+        self.compact_sockets.discard(websocket)
+        for index, key in ((self.rooms, room_id), (self.users, user_id)):
+            if key is None or key not in index:
+                continue
+            index[key].discard(websocket)
+            if not index[key]:
+                del index[key]
+        logger.info(f"WebSocket disconnected (rental_id={room_id}, user_id={user_id}).")
+
+    async def _send(self, connections, message: str):
+        # 전송 중 disconnect로 집합이 바뀔 수 있으므로 복사본으로 순회
+        for connection in list(connections):
+            try:
+                await connection.send_text(message)
+            except Exception as e:
+                # 끊긴 소켓(WebSocketDisconnect, ConnectionClosed 등)이 다른 수신자나 호출자의 루프를 깨지 않도록 연결별로 처리
+                logger.error(f"Error sending to websocket: {e!r}")
+                self.disconnect(connection)
+
+    def room_needs_full_format(self, rental_id: str) -> bool:
+        """방에 전체 형식 메시지를 받는 소켓이 하나라도 있는지 (없으면 전체 형식 직렬화를 생략 가능)"""
+        return any(connection not in self.compact_sockets for connection in self.rooms.get(rental_id, ()))
+
+    async def broadcast(self, message: Optional[str], rental_id: str, compact_message: Optional[str] = None):
+        """특정 채팅방의 모든 소켓에 전송. compact_message가 있으면 축약 형식을 요청한 소켓에는 그것을 보냄"""
+        connections = self.rooms.get(rental_id, ())
+        if compact_message is None:
+            await self._send(connections, message)
+            return
+        compact = [connection for connection in connections if connection in self.compact_sockets]
+        full = [connection for connection in connections if connection not in self.compact_sockets]
+        await self._send(compact, compact_message)
+        if full:
+            await self._send(full, message)
+
+    async def send_to_user(self, message: str, user_id: str):
+        """사용자의 모든 소켓(여러 방, 여러 기기)에 전송"""
+        await self._send(self.users.get(user_id, ()), message)
+
+    def notify_user(self, user_id, event: str, **data):
+        """
+        동기 코드(작업 큐 핸들러 등)에서 사용자에게 알림을 보냄.
+        이 프로세스에 연결된 소켓이 없으면 아무 것도 하지 않으므로, 소켓이 없는 별도 워커 프로세스(worker.py)에서
+        호출하면 전달되지 않음 (알림 작업은 task_queue.register(..., local=True)로 앱 프로세스에서 실행).
+        """
+        user_key = str(user_id)
+        if self._loop is None or user_key not in self.users:
+            return
+        message = json.dumps({"type": "notification", "event": event, **data})
+        future = asyncio.run_coroutine_threadsafe(self.send_to_user(message, user_key), self._loop)
+        future.add_done_callback(lambda f: self._log_notify_result(f, event, user_key))
+
+    @staticmethod
+    def _log_notify_result(future, event: str, user_key: str):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Failed to deliver notification {event} to user {user_key}: {future.exception()!r}")
 
 # Create a single instance of the ConnectionManager to be used by the router
 manager = ConnectionManager()
@@ -1,7 +1,14 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.requests import HTTPConnection
 import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
 
 # Render 배포 시 환경 변수에서 DATABASE_URL을 가져옵니다.
 # 로컬 테스트 시에는 주석 처리된 SQLite를 사용하거나 직접 URL을 넣으세요.
@@ -11,20 +18,112 @@ SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
 if SQLALCHEMY_DATABASE_URL.startswith("postgres://"):
     SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-connect_args = {}
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+# 읽기 전용 복제본(replica) URL. 없으면 모든 읽기도 primary로 보냄
+# 로컬 테스트는 SQLite 파일 두 개로 가능 (예: REPLICA_DATABASE_URL=sqlite:///./replica.db)
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+if REPLICA_DATABASE_URL and REPLICA_DATABASE_URL.startswith("postgres://"):
+    REPLICA_DATABASE_URL = REPLICA_DATABASE_URL.replace("postgres://", "postgresql://", 1)
+
+# 자신이 쓴 데이터를 바로 읽을 수 있도록, 쓰기 후 이 시간(초) 동안은 해당 클라이언트의 읽기를 primary로 보냄
+READ_YOUR_WRITES_WINDOW = float(os.getenv("READ_YOUR_WRITES_WINDOW", "5"))
+# replica 연결 실패 시 이 시간(초) 동안은 replica를 시도하지 않고 primary 사용
+REPLICA_RETRY_INTERVAL = float(os.getenv("REPLICA_RETRY_INTERVAL", "30"))
+
+def _connect_args(url: str):
+    if url.startswith("sqlite"):
+        return {"check_same_thread": False}
+    return {}
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args=connect_args
+    connect_args=_connect_args(SQLALCHEMY_DATABASE_URL)
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+replica_engine = None
+ReplicaSessionLocal = None
+if REPLICA_DATABASE_URL:
+    replica_engine = create_engine(
+        REPLICA_DATABASE_URL,
+        connect_args=_connect_args(REPLICA_DATABASE_URL)
+    )
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
 Base = declarative_base()
 
-def get_db():
+# --- read-your-writes 추적 ---
+# 키는 요청의 인증 토큰 (Authorization 헤더 또는 WebSocket의 token 쿼리)
+_recent_writes = {}
+_recent_writes_lock = threading.Lock()
+_replica_down_until = 0.0
+
+def _client_key(connection: HTTPConnection):
+    authorization = connection.headers.get("authorization")
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:]
+    return connection.query_params.get("token")
+
+def mark_recent_write(client_key: str):
+    with _recent_writes_lock:
+        now = time.monotonic()
+        _recent_writes[client_key] = now + READ_YOUR_WRITES_WINDOW
+        # 만료된 항목 정리
+        if len(_recent_writes) > 10000:
+            for key in [key for key, until in _recent_writes.items() if until <= now]:
+                del _recent_writes[key]
+
+def has_recent_write(client_key: str) -> bool:
+    until = _recent_writes.get(client_key)
+    return until is not None and until > time.monotonic()
+
+@event.listens_for(SessionLocal, "after_flush")
+def _flag_write(session, flush_context):
+    session.info["has_writes"] = True
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_write(session):
+    client_key = session.info.get("client_key")
+    if client_key and session.info.pop("has_writes", False):
+        mark_recent_write(client_key)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _clear_write(session):
+    session.info.pop("has_writes", None)
+
+def get_db(connection: HTTPConnection):
     db = SessionLocal()
+    db.info["client_key"] = _client_key(connection)
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db(connection: HTTPConnection):
+    """
+    읽기 전용 엔드포인트용 세션. replica가 설정되어 있으면 replica를 사용하되,
+    최근에 쓰기를 한 클라이언트이거나 replica가 응답하지 않으면 primary로 보냄.
+    """
+    global _replica_down_until
+    client_key = _client_key(connection)
+    use_replica = (
+        ReplicaSessionLocal is not None
+        and time.monotonic() >= _replica_down_until
+        and not (client_key and has_recent_write(client_key))
+    )
+
+    db = None
+    if use_replica:
+        db = ReplicaSessionLocal()
+        try:
+            db.connection()
+        except OperationalError as e:
+            logger.error(f"Replica unavailable, falling back to primary: {e}")
+            db.close()
+            db = None
+            _replica_down_until = time.monotonic() + REPLICA_RETRY_INTERVAL
+    if db is None:
+        db = SessionLocal()
+        db.info["client_key"] = client_key
     try:
         yield db
     finally:
@@ -0,0 +1,158 @@
+import os
+import logging
+from sqlalchemy import func, select, update, or_
+from sqlalchemy.orm import joinedload
+
+from . import models, database, analytics, rate_limit, revocation
+from .tasks import task_queue
+from .connection_manager import manager
+
+logger = logging.getLogger(__name__)
+
+RATING_RECONCILE_INTERVAL = float(os.getenv("RATING_RECONCILE_INTERVAL", "3600")) # seconds
+ANALYTICS_COMPACTION_INTERVAL = float(os.getenv("ANALYTICS_COMPACTION_INTERVAL", "86400")) # seconds
+RATE_LIMIT_PRUNE_INTERVAL = float(os.getenv("RATE_LIMIT_PRUNE_INTERVAL", "3600")) # seconds
+REFRESH_TOKEN_PRUNE_INTERVAL = float(os.getenv("REFRESH_TOKEN_PRUNE_INTERVAL", "86400")) # seconds
+
+# 커밋 이후 실행되는 부수 작업 모음.
+# 라우터에서는 커밋 후 task_queue.enqueue_after_commit("<이름>", ...) 형태로만 호출한다.
+# 알림 작업은 이 프로세스의 WebSocket 연결로 전송하므로 durable 모드에서도 앱 프로세스에서 실행한다 (local=True).
+
+
+@task_queue.register("notify_instructor_new_rental", local=True)
+def notify_instructor_new_rental(rental_id: int):
+    """새 대여 신청이 들어오면 담당 강사에게 알림"""
+    db = database.SessionLocal()
+    try:
+        rental = db.query(models.Rental).options(
+            joinedload(models.Rental.equipment)
+        ).filter(models.Rental.rental_id == rental_id).first()
+        if not rental or not rental.equipment or rental.equipment.instructor_id is None:
+            return
+        logger.info(f"New rental {rental_id} for equipment {rental.equip_id} -> instructor {rental.equipment.instructor_id}")
+        manager.notify_user(rental.equipment.instructor_id, "rental_requested",
+                            rental_id=rental_id, equip_id=rental.equip_id)
+    finally:
+        db.close()
+
+
+@task_queue.register("notify_rental_approved", local=True)
+def notify_rental_approved(rental_id: int):
+    """대여 승인 시 신청자에게 알림"""
+    db = database.SessionLocal()
+    try:
+        rental = db.query(models.Rental).filter(models.Rental.rental_id == rental_id).first()
+        if not rental:
+            return
+        logger.info(f"Rental {rental_id} approved -> user {rental.user_id}")
+        manager.notify_user(rental.user_id, "rental_approved",
+                            rental_id=rental_id, equip_id=rental.equip_id)
+    finally:
+        db.close()
+
+
+@task_queue.register("reconcile_equipment_ratings")
+def reconcile_equipment_ratings():
+    """증분 갱신된 rating/review_count를 reviews 테이블 기준으로 재계산해 오차를 보정"""
+    # 읽은 값을 나중에 덮어쓰면 그 사이에 등록된 리뷰의 증분 갱신이 사라지므로, 집계와 갱신을 한 UPDATE 문으로 처리
+    avg_rating = func.coalesce(
+        select(func.avg(models.Review.rating))
+        .where(models.Review.equip_id == models.Equipment.equip_id)
+        .scalar_subquery(), 0.0
+    )
+    review_count = (
+        select(func.count(models.Review.review_id))
+        .where(models.Review.equip_id == models.Equipment.equip_id)
+        .scalar_subquery()
+    )
+    db = database.SessionLocal()
+    try:
+        result = db.execute(
+            update(models.Equipment)
+            .where(or_(
+                func.coalesce(models.Equipment.review_count, -1) != review_count,
+                func.abs(func.coalesce(models.Equipment.rating, -1.0) - avg_rating) > 1e-6
+            ))
+            .values(rating=avg_rating, review_count=review_count)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if result.rowcount:
+            logger.info(f"Reconciled ratings for {result.rowcount} equipment rows.")
+    finally:
+        db.close()
+
+
+task_queue.schedule("reconcile_equipment_ratings", RATING_RECONCILE_INTERVAL, run_immediately=True)
+
+
+@task_queue.register("compact_analytics_rollups")
+def compact_analytics_rollups():
+    """관리자 통계 집계 테이블을 원본 테이블 기준으로 재계산"""
+    db = database.SessionLocal()
+    try:
+        analytics.rebuild_rollups(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+task_queue.schedule("compact_analytics_rollups", ANALYTICS_COMPACTION_INTERVAL)
+
+
+@task_queue.register("backfill_analytics_rollups")
+def backfill_analytics_rollups():
+    """집계 테이블이 비어 있으면(집계 도입 이전 데이터) 원본 테이블 기준으로 채움"""
+    db = database.SessionLocal()
+    try:
+        if not analytics.rollups_empty(db):
+            return
+        analytics.rebuild_rollups(db)
+        db.commit()
+        logger.info("Backfilled empty analytics rollups.")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# 콜드 스타트마다 전체를 다시 읽지 않도록, 시작 시에는 집계 테이블이 비어 있을 때만 채움
+task_queue.run_on_start("backfill_analytics_rollups")
+
+
+@task_queue.register("prune_rate_limit_buckets")
+def prune_rate_limit_buckets():
+    """공유 rate limit 테이블에서 오래 사용되지 않은 버킷 정리"""
+    backend = rate_limit.get_backend()
+    if not isinstance(backend, rate_limit.DatabaseBackend):
+        return
+    db = database.SessionLocal()
+    try:
+        deleted = backend.prune(db, RATE_LIMIT_PRUNE_INTERVAL)
+        if deleted:
+            logger.info(f"Pruned {deleted} idle rate limit buckets.")
+    finally:
+        db.close()
+
+
+if rate_limit.RATE_LIMIT_BACKEND == "database":
+    task_queue.schedule("prune_rate_limit_buckets", RATE_LIMIT_PRUNE_INTERVAL)
+
+
+@task_queue.register("prune_used_refresh_tokens")
+def prune_used_refresh_tokens():
+    """만료된 리프레시 토큰의 사용 기록 정리"""
+    db = database.SessionLocal()
+    try:
+        deleted = revocation.prune_used_refresh_tokens(db)
+        if deleted:
+            logger.info(f"Pruned {deleted} used refresh tokens.")
+    finally:
+        db.close()
+
+
+task_queue.schedule("prune_used_refresh_tokens", REFRESH_TOKEN_PRUNE_INTERVAL)
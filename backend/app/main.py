@@ -1,13 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+import os
 from sqlalchemy.exc import OperationalError
 import time # Import time for sleep
 import logging # Import logging
 
+import asyncio
+import importlib
+import threading
+
 from app import models # Changed from . import models
 from app.database import engine # Changed from .database import engine
-# routers 패키지에서 courses 모듈 추가 임포트
-from app.routers import users, equipment, rentals, courses, chat # Changed from .routers import ...
+from app.tasks import task_queue
+from app.revocation import token_versions
+from app.auth import require_admin
+from app import jobs # 작업 핸들러 등록
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,20 +26,83 @@ logger = logging.getLogger(__name__)
 MAX_RETRIES = 5
 RETRY_DELAY = 5 # seconds
 
-for i in range(MAX_RETRIES):
-    try:
-        logger.info(f"Attempt {i+1}/{MAX_RETRIES}: Creating database tables...")
-        models.Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully.")
-        break # Exit loop if successful
-    except OperationalError as e:
-        logger.error(f"Database connection failed on attempt {i+1}/{MAX_RETRIES}: {e}")
-        if i < MAX_RETRIES - 1:
-            logger.info(f"Retrying in {RETRY_DELAY} seconds...")
-            time.sleep(RETRY_DELAY)
-        else:
-            logger.error("Max retries reached. Could not connect to database.")
-            raise # Re-raise the exception after max retries
+def create_tables():
+    for i in range(MAX_RETRIES):
+        try:
+            logger.info(f"Attempt {i+1}/{MAX_RETRIES}: Creating database tables...")
+            models.Base.metadata.create_all(bind=engine)
+            logger.info("Database tables created successfully.")
+            break # Exit loop if successful
+        except OperationalError as e:
+            logger.error(f"Database connection failed on attempt {i+1}/{MAX_RETRIES}: {e}")
+            if i < MAX_RETRIES - 1:
+                logger.info(f"Retrying in {RETRY_DELAY} seconds...")
+                time.sleep(RETRY_DELAY)
+            else:
+                logger.error("Max retries reached. Could not connect to database.")
+                raise # Re-raise the exception after max retries
+
+# 라우터 목록 (모듈명, prefix, tags)
+ROUTERS = [
+    ("users", "/api/users", ["users"]),
+    ("equipment", "/api/equipment", ["equipment"]),
+    ("rentals", "/api/rentals", ["rentals"]),
+    ("courses", "/api/courses", ["courses"]),
+    ("chat", "/api/chat", ["chat"]),
+    ("reviews", "/api/reviews", ["reviews"]),
+    ("analytics", "/api/analytics", ["analytics"]),
+]
+
+# 1(기본값)이면 DB 테이블 생성과 라우터 import를 서버 시작 이후로 미뤄서
+# 헬스 체크가 곧바로 응답하도록 함 (Render 무료 플랜 콜드 스타트 대응)
+LAZY_STARTUP = os.getenv("LAZY_STARTUP", "1") == "1"
+# 애플리케이션 로드를 기다리지 않고 바로 응답하는 경로
+HEALTH_PATHS = {"/health", "/api/shealth"}
+
+_app_loaded = threading.Event()
+_app_load_lock = threading.Lock()
+# 마지막 로드 실패 원인 (헬스 체크가 503을 반환하는 데 사용, 로드에 성공하면 None)
+_app_load_error = None
+
+def load_application():
+    """DB 테이블을 만들고 라우터를 등록. 여러 번 호출해도 성공할 때까지만 실행됨 (실패하면 다음 요청에서 재시도)."""
+    global _app_load_error
+    if _app_loaded.is_set():
+        return
+    with _app_load_lock:
+        if _app_loaded.is_set():
+            return
+        started = time.perf_counter()
+        try:
+            create_tables()
+            token_versions.sync() # 토큰 검사 전에 폐기된 토큰 버전을 메모리에 로드
+            # 일부만 등록된 채로 실패하면 재시도 시 경로가 중복되므로, 모든 라우터를 import한 뒤에 한꺼번에 등록
+            routers = [
+                (importlib.import_module(f"app.routers.{module_name}").router, prefix, tags)
+                for module_name, prefix, tags in ROUTERS
+            ]
+        except Exception as e:
+            _app_load_error = repr(e)
+            logger.error(f"Application load failed: {e!r}", exc_info=True)
+            raise
+        for router, prefix, tags in routers:
+            app.include_router(router, prefix=prefix, tags=tags)
+        app.openapi_schema = None # 라우터가 추가됐으므로 OpenAPI 스키마를 다시 생성
+        _app_load_error = None
+        _app_loaded.set()
+        logger.info(f"Application loaded in {time.perf_counter() - started:.3f}s")
+
+
+class LazyLoadMiddleware:
+    """애플리케이션이 아직 로드되지 않았으면 헬스 체크를 제외한 요청(HTTP/WebSocket)을 로드 완료까지 대기시킴"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] in ("http", "websocket") and not _app_loaded.is_set()
+                and scope["path"] not in HEALTH_PATHS):
+            await asyncio.to_thread(load_application)
+        await self.app(scope, receive, send)
 
 app = FastAPI(title="SportsEdu API", description="Udemy 스타일 공공체육 공유 플랫폼")
 
@@ -43,14 +115,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 라우터 등록
-app.include_router(users.router, prefix="/api/users", tags=["users"])
-app.include_router(equipment.router, prefix="/api/equipment", tags=["equipment"])
-app.include_router(rentals.router, prefix="/api/rentals", tags=["rentals"])
-# courses 라우터 등록 (이제 /courses URL로 접근 가능)
-app.include_router(courses.router, prefix="/api/courses", tags=["courses"])
-app.include_router(chat.router, prefix="/api/chat", tags=["chat"]) # chat 라우터 등록
+# 응답 압축 (이 크기(bytes) 이상이고 클라이언트가 gzip을 지원할 때만)
+# WebSocket은 uvicorn이 permessage-deflate를 기본으로 협상함
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
+# 라우터 등록 (load_application 참고)
+app.add_middleware(LazyLoadMiddleware)
+
+if not LAZY_STARTUP:
+    load_application()
+
+async def start_background_services():
+    # 첫 요청이 로드를 기다리지 않도록 서버 시작 직후 백그라운드에서 미리 로드
+    if not _app_loaded.is_set():
+        try:
+            await asyncio.to_thread(load_application)
+        except Exception:
+            pass # 원인은 load_application이 기록하며, 헬스 체크는 503, 다음 요청에서 재시도
+    # 시작 직후 실행되는 주기 작업/토큰 동기화가 테이블 생성 전에 돌지 않도록 로드 이후에 시작
+    await task_queue.start()
+    await token_versions.start()
+
+_startup_task = None
+
+@app.on_event("startup")
+async def start_lazy_loading():
+    global _startup_task
+    _startup_task = asyncio.create_task(start_background_services())
+
+@app.on_event("shutdown")
+async def stop_task_queue():
+    if _startup_task is not None:
+        _startup_task.cancel()
+        await asyncio.gather(_startup_task, return_exceptions=True)
+    await task_queue.stop()
+    await token_versions.stop()
+
+# 백그라운드 작업 큐 지표 (큐 길이, 처리/실패 건수)
+# durable 모드에서는 조회마다 COUNT 쿼리가 실행되므로 관리자만 사용
+@app.get("/api/tasks/metrics", dependencies=[Depends(require_admin)])
+def task_queue_metrics():
+    return task_queue.metrics()
 
+# render.yaml의 healthCheckPath(/health)와 기존 경로 모두 지원
+@app.get("/health")
 @app.get("/api/shealth")
 def health_check():
+    # 로드가 실패한 상태면 503을 반환해 플랫폼이 인스턴스를 비정상으로 판단하도록 함 (로드 중에는 200)
+    if _app_load_error is not None and not _app_loaded.is_set():
+        return JSONResponse(status_code=503, content={"status": "error", "detail": _app_load_error})
     return {"status": "ok"}
\ No newline at end of file
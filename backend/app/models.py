@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Text, Float, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
 import enum
+from datetime import datetime
 
 # 사용자 권한 정의
 class UserRole(str, enum.Enum):
@@ -31,7 +32,8 @@ class Equipment(Base):
     name = Column(String, index=True)
     category = Column(String)
     instructor_id = Column(Integer, ForeignKey("users.user_id"), nullable=True) # New foreign key for instructor
-    rating = Column(Float, default=0.0)
+    # 리뷰 등록 시 같은 트랜잭션에서 증분 갱신됨 (routers/reviews.py)
+    rating = Column(Float, default=0.0, index=True)
     review_count = Column(Integer, default=0)
     badge = Column(String, nullable=True)
     total_qty = Column(Integer, default=0)
@@ -43,6 +45,7 @@ class Equipment(Base):
     instructor_user = relationship("User", back_populates="instructed_equipment") # Relationship to User model
     rentals = relationship("Rental", back_populates="equipment")
     courses = relationship("EquipmentCourse", back_populates="equipment")
+    reviews = relationship("Review", back_populates="equipment")
 
     @property
     def instructor(self):
@@ -103,4 +106,83 @@ class ChatMessage(Base):
 
     sender = relationship("User", foreign_keys=[sender_id], back_populates="chat_messages_sent")
     receiver = relationship("User", foreign_keys=[receiver_id], back_populates="chat_messages_received")
-    rental = relationship("Rental") # New rental relationship
\ No newline at end of file
+    rental = relationship("Rental") # New rental relationship
+
+class Review(Base):
+    __tablename__ = "reviews"
+    __table_args__ = (UniqueConstraint("equip_id", "user_id", name="uq_review_equip_user"),)
+
+    review_id = Column(Integer, primary_key=True, index=True)
+    equip_id = Column(Integer, ForeignKey("equipment.equip_id"), index=True)
+    user_id = Column(Integer, ForeignKey("users.user_id"))
+    rating = Column(Integer) # 1 ~ 5
+    comment = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    equipment = relationship("Equipment", back_populates="reviews")
+    user = relationship("User")
+
+class UserTokenVersion(Base):
+    """사용자별 토큰 버전. 버전이 오르면 이전에 발급된 토큰은 무효 (app/revocation.py)"""
+    __tablename__ = "user_token_versions"
+
+    user_id = Column(Integer, ForeignKey("users.user_id"), primary_key=True)
+    version = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class UsedRefreshToken(Base):
+    """한 번 사용(재발급)된 리프레시 토큰의 jti. 같은 토큰을 다시 제출하면 거부 (app/revocation.py)"""
+    __tablename__ = "used_refresh_tokens"
+
+    jti = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.user_id"), index=True)
+    expires_at = Column(DateTime, index=True) # 토큰 만료 시각 (이후에는 행을 삭제해도 됨)
+
+# --- 관리자 통계용 일별 집계 테이블 (app/analytics.py) ---
+
+class DailyRentalStats(Base):
+    """대여 신청일(day) x 장비별 상태 집계. 대여 생성/승인 시 증분 갱신"""
+    __tablename__ = "daily_rental_stats"
+    __table_args__ = (UniqueConstraint("day", "equip_id", name="uq_daily_rental_stats_day_equip"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, index=True)
+    equip_id = Column(Integer, ForeignKey("equipment.equip_id"))
+    requested = Column(Integer, default=0)
+    pending = Column(Integer, default=0)
+    approved = Column(Integer, default=0)
+
+class DailyChatStats(Base):
+    """일별 채팅 메시지 수. 메시지 저장 시 증분 갱신"""
+    __tablename__ = "daily_chat_stats"
+
+    day = Column(Date, primary_key=True)
+    message_count = Column(Integer, default=0)
+
+class JobStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+class BackgroundJob(Base):
+    """durable 모드 작업 큐 (app/tasks.py, worker.py)"""
+    __tablename__ = "background_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, index=True)
+    payload = Column(Text, nullable=True) # JSON 직렬화된 kwargs
+    status = Column(String, default=JobStatus.PENDING, index=True)
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+    run_after = Column(DateTime, default=datetime.utcnow, index=True)
+    claimed_at = Column(DateTime, nullable=True) # RUNNING으로 선점한 시각 (lease 만료 판단용)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class RateLimitBucket(Base):
+    """여러 워커/인스턴스가 공유하는 토큰 버킷 상태 (app/rate_limit.py, RATE_LIMIT_BACKEND=database)"""
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String, primary_key=True) # "<limiter 이름>:<클라이언트 IP>"
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False) # epoch seconds (인스턴스 간 비교를 위해 monotonic 대신 사용)
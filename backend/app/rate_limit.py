@@ -0,0 +1,200 @@
+import os
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException, Request, status
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from . import models, database
+
+logger = logging.getLogger(__name__)
+
+# 환경변수로 조정 가능한 기본 한도 (capacity: 순간 허용량, rate: 초당 충전 토큰 수)
+LOGIN_RATE_CAPACITY = int(os.getenv("LOGIN_RATE_CAPACITY", "5"))
+LOGIN_RATE_PER_SEC = float(os.getenv("LOGIN_RATE_PER_SEC", "0.2")) # 분당 12회
+SIGNUP_RATE_CAPACITY = int(os.getenv("SIGNUP_RATE_CAPACITY", "3"))
+SIGNUP_RATE_PER_SEC = float(os.getenv("SIGNUP_RATE_PER_SEC", "0.05")) # 분당 3회
+# 토큰 재발급은 여러 탭/요청이 동시에 만료를 만나므로 로그인보다 넉넉하게
+REFRESH_RATE_CAPACITY = int(os.getenv("REFRESH_RATE_CAPACITY", "20"))
+REFRESH_RATE_PER_SEC = float(os.getenv("REFRESH_RATE_PER_SEC", "1")) # 분당 60회
+WS_MESSAGE_RATE_CAPACITY = int(os.getenv("WS_MESSAGE_RATE_CAPACITY", "10"))
+WS_MESSAGE_RATE_PER_SEC = float(os.getenv("WS_MESSAGE_RATE_PER_SEC", "2"))
+
+# 버킷 저장소: memory(프로세스별, 기본값) | database(모든 워커/인스턴스가 DB 테이블을 공유)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+# 앱 앞단에서 X-Forwarded-For에 IP를 덧붙이는 신뢰 프록시 수.
+# 기본값 0은 헤더를 무시 (프록시가 없으면 헤더는 클라이언트가 임의로 보낸 값). Render는 render.yaml에서 1로 설정
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", "0"))
+
+
+class TokenBucket:
+    """단일 토큰 버킷 (WebSocket 연결별 제한처럼 공유가 필요 없는 경우 직접 사용)"""
+    def __init__(self, capacity: int, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def consume(self, cost: float = 1.0) -> Tuple[bool, float]:
+        """토큰을 소비. (허용 여부, 재시도까지 남은 초)를 반환"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True, 0.0
+        return False, (cost - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+
+class RateLimitBackend(ABC):
+    """
+    버킷 상태 저장소 인터페이스.
+    InMemoryBackend(프로세스별)와 DatabaseBackend(공유) 중 RATE_LIMIT_BACKEND로 선택하며,
+    다른 공유 저장소를 쓰려면 이 클래스를 상속해 set_backend()로 교체한다.
+    """
+    @abstractmethod
+    def consume(self, key: str, capacity: int, rate: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """key의 버킷에서 cost만큼 소비. (허용 여부, 재시도까지 남은 초)를 반환"""
+
+
+class InMemoryBackend(RateLimitBackend):
+    """프로세스 메모리에 키별 버킷을 보관 (기본값)"""
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self.buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, rate: float, cost: float = 1.0) -> Tuple[bool, float]:
+        with self._lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                if len(self.buckets) >= self.max_keys:
+                    self._prune()
+                bucket = self.buckets[key] = TokenBucket(capacity, rate)
+            return bucket.consume(cost)
+
+    def _prune(self):
+        # 이미 가득 찬(오래 사용되지 않은) 버킷은 새로 만든 것과 같으므로 삭제해도 무방
+        now = time.monotonic()
+        for key in [
+            key for key, bucket in self.buckets.items()
+            if bucket.tokens + (now - bucket.updated_at) * bucket.rate >= bucket.capacity
+        ]:
+            del self.buckets[key]
+
+
+class DatabaseBackend(RateLimitBackend):
+    """
+    rate_limit_buckets 테이블에 버킷을 보관해 여러 워커/인스턴스가 한도를 공유.
+    요청 세션과 분리된 자체 세션을 사용하며, 동시 갱신은 updated_at 비교 조건부 UPDATE로
+    감지해 재시도한다 (SELECT ... FOR UPDATE가 없는 SQLite에서도 동일하게 동작).
+    """
+    def __init__(self, max_attempts: int = 5):
+        self.max_attempts = max_attempts
+
+    def consume(self, key: str, capacity: int, rate: float, cost: float = 1.0) -> Tuple[bool, float]:
+        db = database.SessionLocal()
+        try:
+            for _ in range(self.max_attempts):
+                now = time.time()
+                row = db.query(models.RateLimitBucket.tokens, models.RateLimitBucket.updated_at).filter(
+                    models.RateLimitBucket.key == key
+                ).first()
+                if row is None:
+                    tokens = float(capacity)
+                else:
+                    tokens = min(capacity, row.tokens + max(0.0, now - row.updated_at) * rate)
+                allowed = tokens >= cost
+                remaining = tokens - cost if allowed else tokens
+
+                if row is None:
+                    db.add(models.RateLimitBucket(key=key, tokens=remaining, updated_at=now))
+                    try:
+                        db.commit()
+                    except IntegrityError:
+                        # 같은 키를 다른 요청이 먼저 만든 경우
+                        db.rollback()
+                        continue
+                else:
+                    result = db.execute(
+                        update(models.RateLimitBucket)
+                        .where(models.RateLimitBucket.key == key, models.RateLimitBucket.updated_at == row.updated_at)
+                        .values(tokens=remaining, updated_at=now)
+                    )
+                    db.commit()
+                    if result.rowcount == 0:
+                        # 읽은 뒤 다른 요청이 먼저 갱신함
+                        continue
+
+                if allowed:
+                    return True, 0.0
+                return False, (cost - tokens) / rate if rate > 0 else float("inf")
+            logger.warning(f"Rate limit bucket {key} is heavily contended; denying request.")
+            return False, 1.0
+        except Exception as e:
+            # 저장소 장애로 로그인 자체를 막지 않도록 허용 (fail-open)
+            db.rollback()
+            logger.error(f"Rate limit backend error for {key}: {e}")
+            return True, 0.0
+        finally:
+            db.close()
+
+    def prune(self, db, idle_seconds: float) -> int:
+        """idle_seconds 동안 갱신되지 않은 버킷 삭제 (충분히 오래 지난 버킷은 가득 찬 새 버킷과 같음)"""
+        deleted = db.query(models.RateLimitBucket).filter(
+            models.RateLimitBucket.updated_at < time.time() - idle_seconds
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+
+_backend: RateLimitBackend = DatabaseBackend() if RATE_LIMIT_BACKEND == "database" else InMemoryBackend()
+
+def set_backend(backend: RateLimitBackend):
+    global _backend
+    _backend = backend
+
+def get_backend() -> RateLimitBackend:
+    return _backend
+
+
+def get_client_ip(request: Request) -> str:
+    # X-Forwarded-For의 앞쪽 값은 클라이언트가 임의로 넣을 수 있으므로,
+    # 신뢰 프록시가 덧붙인 오른쪽에서 TRUSTED_PROXY_COUNT번째 값을 클라이언트 IP로 사용
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if forwarded_for and TRUSTED_PROXY_COUNT > 0:
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        if len(hops) >= TRUSTED_PROXY_COUNT:
+            return hops[-TRUSTED_PROXY_COUNT]
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    """
+    라우터 의존성으로 사용하는 IP 기준 토큰 버킷 제한.
+    예) @router.post("/login", dependencies=[Depends(login_rate_limiter)])
+    """
+    def __init__(self, name: str, capacity: int, rate: float):
+        self.name = name
+        self.capacity = capacity
+        self.rate = rate
+
+    def __call__(self, request: Request):
+        self.check(get_client_ip(request))
+
+    def check(self, key: str, backend: Optional[RateLimitBackend] = None):
+        allowed, retry_after = (backend or get_backend()).consume(f"{self.name}:{key}", self.capacity, self.rate)
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="요청이 너무 많습니다. 잠시 후 다시 시도해주세요.",
+                headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+            )
+
+
+login_rate_limiter = RateLimiter("login", LOGIN_RATE_CAPACITY, LOGIN_RATE_PER_SEC)
+signup_rate_limiter = RateLimiter("signup", SIGNUP_RATE_CAPACITY, SIGNUP_RATE_PER_SEC)
+refresh_rate_limiter = RateLimiter("refresh", REFRESH_RATE_CAPACITY, REFRESH_RATE_PER_SEC)
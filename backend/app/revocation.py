@@ -0,0 +1,131 @@
+import os
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict
+from sqlalchemy.exc import IntegrityError
+
+from . import models, database
+
+logger = logging.getLogger(__name__)
+
+# 다른 워커 프로세스의 폐기(revocation)를 반영하는 주기 (초)
+REVOCATION_SYNC_INTERVAL = float(os.getenv("REVOCATION_SYNC_INTERVAL", "2"))
+
+
+class TokenVersionStore:
+    """
+    사용자별 토큰 버전 카운터 (메모리).
+    토큰에는 발급 시점의 버전(ver)이 들어가며, 버전을 올리면 그 이전에 발급된 토큰은 모두 무효가 된다.
+    요청마다의 검사는 메모리 dict 조회(O(1))이며, DB(user_token_versions)는 재시작과
+    워커 간 공유를 위해서만 사용한다. 다른 워커에서 올린 버전은 sync()로 주기적으로 반영된다.
+    """
+    def __init__(self):
+        self.versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._synced_at = None
+        self._sync_task = None
+
+    def current(self, user_id: int) -> int:
+        return self.versions.get(user_id, 0)
+
+    def is_current(self, user_id: int, version: int) -> bool:
+        # 아직 동기화되지 않은 다른 워커에서 새 버전으로 발급된 토큰도 허용 (버전은 위조 불가)
+        return version >= self.versions.get(user_id, 0)
+
+    def _merge(self, rows):
+        with self._lock:
+            for user_id, version in rows:
+                # 버전은 증가만 하므로 큰 값을 유지
+                if version > self.versions.get(user_id, 0):
+                    self.versions[user_id] = version
+
+    def fetch(self, db, user_id: int) -> int:
+        """DB 기준 최신 버전을 읽어 메모리에 반영 (토큰 발급 시 사용)"""
+        version = db.query(models.UserTokenVersion.version).filter(
+            models.UserTokenVersion.user_id == user_id
+        ).scalar()
+        self._merge([(user_id, version or 0)])
+        return self.current(user_id)
+
+    def bump(self, db, user_id: int) -> int:
+        """user_id의 토큰 버전을 올림 (기존 토큰 전부 폐기). commit은 호출자가 수행"""
+        row = db.query(models.UserTokenVersion).filter(
+            models.UserTokenVersion.user_id == user_id
+        ).with_for_update().first()
+        if row is None:
+            row = models.UserTokenVersion(user_id=user_id, version=self.current(user_id))
+            db.add(row)
+        row.version = max(row.version or 0, self.current(user_id)) + 1
+        row.updated_at = datetime.utcnow()
+        self._merge([(user_id, row.version)])
+        return row.version
+
+    def sync(self):
+        """DB에서 마지막 동기화 이후 변경된 버전만 읽어와 메모리에 반영 (최초 호출 시 전체 로드)"""
+        db = database.SessionLocal()
+        try:
+            query = db.query(models.UserTokenVersion.user_id, models.UserTokenVersion.version)
+            now = datetime.utcnow()
+            if self._synced_at is not None:
+                # 워커 간 시계 차이/커밋 지연을 고려해 구간을 조금 겹쳐서 조회
+                query = query.filter(
+                    models.UserTokenVersion.updated_at >= self._synced_at - timedelta(seconds=REVOCATION_SYNC_INTERVAL * 2)
+                )
+            self._merge(query.all())
+            self._synced_at = now
+        finally:
+            db.close()
+
+    async def start(self, interval: float = REVOCATION_SYNC_INTERVAL):
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_loop(interval))
+
+    async def stop(self):
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+            self._sync_task = None
+
+    async def _sync_loop(self, interval: float):
+        while True:
+            try:
+                await asyncio.to_thread(self.sync)
+            except Exception as e:
+                logger.error(f"Token version sync failed: {e}")
+            await asyncio.sleep(interval)
+
+
+
+def use_refresh_token(db, payload: dict) -> bool:
+    """
+    리프레시 토큰을 사용 처리 (한 번만 사용 가능). 이미 사용된 토큰이면 False.
+    로그아웃(버전 증가) 외에, 재발급에 사용된 리프레시 토큰도 이 기록으로 폐기된다.
+    """
+    jti = payload.get("jti")
+    if not jti:
+        return False
+    db.add(models.UsedRefreshToken(
+        jti=jti, user_id=payload["uid"], expires_at=datetime.utcfromtimestamp(payload["exp"])
+    ))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        # 탈취된 토큰의 재사용일 수 있으므로 기록
+        logger.warning(f"Refresh token reuse detected for user {payload['uid']} (jti={jti}).")
+        return False
+    return True
+
+
+def prune_used_refresh_tokens(db) -> int:
+    """이미 만료된 리프레시 토큰의 사용 기록 삭제 (만료된 토큰은 서명 검사에서 거부되므로 기록이 필요 없음)"""
+    deleted = db.query(models.UsedRefreshToken).filter(
+        models.UsedRefreshToken.expires_at < datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+token_versions = TokenVersionStore()
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from datetime import timedelta
+from typing import List
+from app import models, schemas, database, auth, analytics
+
+router = APIRouter()
+
+# 모든 통계는 일별 집계 테이블(daily_rental_stats, daily_chat_stats)만 읽음
+# 날짜는 집계 키와 같은 analytics.STATS_TIMEZONE 기준
+
+# 역할은 토큰에 들어 있으므로 사용자 테이블을 조회하지 않음
+require_admin = auth.require_admin
+
+def _since(days: int):
+    return analytics.stats_day() - timedelta(days=days - 1)
+
+
+# [관리자] 장비별 가동률 및 기간 내 신청/승인 건수
+@router.get("/utilization", response_model=List[schemas.EquipmentUtilization])
+def read_utilization(days: int = 30, _: schemas.TokenData = Depends(require_admin), db: Session = Depends(database.get_read_db)):
+    stats = {
+        equip_id: (requested, approved)
+        for equip_id, requested, approved in db.query(
+            models.DailyRentalStats.equip_id,
+            func.sum(models.DailyRentalStats.requested),
+            func.sum(models.DailyRentalStats.approved)
+        ).filter(models.DailyRentalStats.day >= _since(days)).group_by(models.DailyRentalStats.equip_id).all()
+    }
+    result = []
+    for equip in db.query(models.Equipment).order_by(models.Equipment.equip_id).all():
+        requested, approved = stats.get(equip.equip_id, (0, 0))
+        total_qty = equip.total_qty or 0
+        in_use = total_qty - (equip.available_qty or 0)
+        result.append({
+            "equip_id": equip.equip_id,
+            "name": equip.name,
+            "category": equip.category,
+            "total_qty": total_qty,
+            "in_use": in_use,
+            "utilization": in_use / total_qty if total_qty else 0.0,
+            "requested": requested or 0,
+            "approved": approved or 0,
+        })
+    return result
+
+
+# [관리자] 카테고리별 대여 신청 수요
+@router.get("/demand", response_model=List[schemas.CategoryDemand])
+def read_demand(days: int = 30, _: schemas.TokenData = Depends(require_admin), db: Session = Depends(database.get_read_db)):
+    rows = db.query(
+        models.Equipment.category,
+        func.sum(models.DailyRentalStats.requested),
+        func.sum(models.DailyRentalStats.approved)
+    ).join(
+        models.Equipment, models.Equipment.equip_id == models.DailyRentalStats.equip_id
+    ).filter(
+        models.DailyRentalStats.day >= _since(days)
+    ).group_by(models.Equipment.category).all()
+    return [
+        {"category": category, "requested": requested or 0, "approved": approved or 0}
+        for category, requested, approved in rows
+    ]
+
+
+# [관리자] 승인 대기 중인 신청 건수
+@router.get("/pending", response_model=schemas.PendingQueue)
+def read_pending_queue(_: schemas.TokenData = Depends(require_admin), db: Session = Depends(database.get_read_db)):
+    pending, oldest_day = db.query(
+        func.sum(models.DailyRentalStats.pending),
+        func.min(models.DailyRentalStats.day)
+    ).filter(models.DailyRentalStats.pending > 0).one()
+    return {"pending": pending or 0, "oldest_day": oldest_day}
+
+
+# [관리자] 일별 채팅 메시지 수
+@router.get("/chat-volume", response_model=List[schemas.ChatVolume])
+def read_chat_volume(days: int = 30, _: schemas.TokenData = Depends(require_admin), db: Session = Depends(database.get_read_db)):
+    return db.query(models.DailyChatStats).filter(
+        models.DailyChatStats.day >= _since(days)
+    ).order_by(models.DailyChatStats.day).all()
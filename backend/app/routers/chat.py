@@ -1,10 +1,5 @@
-import sys
-import os
-# 상위 폴더 경로 추가 (Import Error 방지)
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect, Query
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session, joinedload
 from typing import List
@@ -12,20 +7,38 @@ import json
 from datetime import datetime
 from zoneinfo import ZoneInfo # Import ZoneInfo
 
-from .. import models, schemas, database, auth
+from .. import models, schemas, database, auth, analytics
 from ..connection_manager import manager # Import the new manager
+from ..rate_limit import TokenBucket, WS_MESSAGE_RATE_CAPACITY, WS_MESSAGE_RATE_PER_SEC
 
-# Add logging configuration
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 router = APIRouter()
 
+# 알림 전용 소켓 (대여 승인 등 서버 푸시). 채팅방 소켓보다 먼저 등록해야 경로가 겹치지 않음
+@router.websocket("/ws/notifications")
+async def notification_endpoint(
+    websocket: WebSocket,
+    # 연결 내내 DB 연결을 점유하지 않도록 토큰만으로 인증
+    claims: schemas.TokenData = Depends(auth.get_claims_from_token_query)
+):
+    await manager.connect(websocket, user_id=str(claims.user_id))
+    try:
+        while True:
+            # 클라이언트 메시지는 사용하지 않고 연결 유지(ping) 용도로만 수신
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(websocket)
+
 @router.websocket("/ws/{rental_id}")
 async def websocket_endpoint(
     websocket: WebSocket,
     rental_id: int,
+    # "compact"이면 중첩 객체 없이 축약된 메시지(schemas.ChatMessageCompact)를 받음
+    format: str = Query("full"),
     current_user: models.User = Depends(auth.get_user_from_token_query),
     db: Session = Depends(database.get_db)
 ):
@@ -45,10 +58,18 @@ async def websocket_endpoint(
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Not authorized for this chat.")
         return
 
-    await manager.connect(websocket, str(rental_id))
+    await manager.connect(websocket, str(rental_id), str(user_id), compact=(format == "compact"))
+    # 연결별 메시지 수신 속도 제한 (메시지마다 DB commit이 발생하므로)
+    message_bucket = TokenBucket(WS_MESSAGE_RATE_CAPACITY, WS_MESSAGE_RATE_PER_SEC)
     try:
         while True:
             data = await websocket.receive_text()
+            allowed, _ = message_bucket.consume()
+            if not allowed:
+                logger.warning(f"Message rate limit exceeded by user {user_id} in rental_id: {rental_id}")
+                manager.disconnect(websocket, str(rental_id))
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="메시지 전송 속도 제한을 초과했습니다.")
+                return
             message_data = json.loads(data)
             message_content = message_data.get("message")
             
@@ -67,9 +88,26 @@ async def websocket_endpoint(
                 timestamp=datetime.now(ZoneInfo("Asia/Seoul"))
             )
             db.add(chat_message)
+            analytics.record_chat_message(db, chat_message.timestamp)
             db.commit()
             db.refresh(chat_message)
 
+            compact_message = schemas.ChatMessageCompact(
+                id=chat_message.id,
+                sender_id=user_id,
+                sender_name=current_user.name,
+                receiver_id=receiver_id,
+                rental_id=rental_id,
+                message=message_content,
+                timestamp=chat_message.timestamp
+            ).model_dump_json()
+
+            # 방 안의 모든 소켓이 축약 형식이면 무거운 조인 조회와 전체 직렬화를 생략
+            if not manager.room_needs_full_format(str(rental_id)):
+                logger.info(f"Broadcasting compact message {chat_message.id} to rental_id: {rental_id}")
+                await manager.broadcast(None, str(rental_id), compact_message=compact_message)
+                continue
+
             full_chat_message = db.query(models.ChatMessage).options(
                 joinedload(models.ChatMessage.sender),
                 joinedload(models.ChatMessage.receiver),
@@ -83,8 +121,8 @@ async def websocket_endpoint(
 
             full_message = jsonable_encoder(full_chat_message)
             
-            logger.info(f"Broadcasting message: {full_message} to rental_id: {rental_id}") # Added log
-            await manager.broadcast(json.dumps(full_message), str(rental_id))
+            logger.info(f"Broadcasting message {chat_message.id} to rental_id: {rental_id}") # Added log
+            await manager.broadcast(json.dumps(full_message), str(rental_id), compact_message=compact_message)
 
     except WebSocketDisconnect:
         logger.info(f"WebSocketDisconnect for rental_id: {rental_id}") # Changed print to logger.info
@@ -97,7 +135,7 @@ async def websocket_endpoint(
 def get_chat_history(
     rental_id: int,
     current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(database.get_db)
+    db: Session = Depends(database.get_read_db)
 ):
     # Ensure user is part of the rental to view history
     rental = db.query(models.Rental).filter(models.Rental.rental_id == rental_id).first()
@@ -10,7 +10,7 @@ def read_courses(
     skip: int = 0, 
     limit: int = 100, 
     equip_id: Optional[int] = None, 
-    db: Session = Depends(database.get_db)
+    db: Session = Depends(database.get_read_db)
 ):
     query = db.query(models.Course)
     
@@ -47,6 +47,32 @@ def read_course(course_id: int, db: Session = Depends(database.get_db)):
         raise HTTPException(status_code=404, detail="해당 강의를 찾을 수 없습니다.")
     return course
 
+def _build_courses(courses: List[schemas.CourseCreate], db: Session) -> List[models.Course]:
+    """요청된 모든 장비를 IN 쿼리 한 번으로 검증하고, 강의와 장비 연결을 세션에 추가 (commit은 호출자가 수행)"""
+    requested_ids = {equip_id for course in courses for equip_id in course.equip_ids}
+    found_ids = {
+        row.equip_id for row in
+        db.query(models.Equipment.equip_id).filter(models.Equipment.equip_id.in_(requested_ids)).all()
+    }
+    missing_ids = sorted(requested_ids - found_ids)
+    if missing_ids:
+        raise HTTPException(status_code=404, detail=f"연결할 장비를 찾을 수 없습니다: {missing_ids}")
+
+    new_courses = []
+    for course in courses:
+        new_course = models.Course(
+            title=course.title,
+            description=course.description,
+            content_type=course.content_type,
+            duration=course.duration,
+            content_url=course.content_url,
+            # relationship으로 연결하면 flush 시 course_id가 자동으로 채워짐
+            equipments=[models.EquipmentCourse(equip_id=equip_id) for equip_id in course.equip_ids]
+        )
+        db.add(new_course)
+        new_courses.append(new_course)
+    return new_courses
+
 @router.post("/", response_model=schemas.Course, status_code=status.HTTP_201_CREATED)
 def create_course(
     course: schemas.CourseCreate, 
@@ -55,27 +81,31 @@ def create_course(
 ):
     if current_user.role != models.UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="관리자만 강의를 생성할 수 있습니다.")
-    
-    equipment = db.query(models.Equipment).filter(models.Equipment.equip_id == course.equip_id).first()
-    if not equipment:
-        raise HTTPException(status_code=404, detail="연결할 장비를 찾을 수 없습니다.")
 
-    new_course = models.Course(
-        title=course.title,
-        description=course.description,
-        content_type=course.content_type,
-        duration=course.duration,
-        content_url=course.content_url
-    )
-    db.add(new_course)
+    new_course = _build_courses([course], db)[0]
+    db.flush() # course_id 할당
+    # commit 후에는 객체가 만료되어 다시 SELECT 하므로 commit 전에 응답을 직렬화
+    response = schemas.Course.model_validate(new_course)
     db.commit()
-    db.refresh(new_course)
 
-    equipment_course_link = models.EquipmentCourse(
-        equip_id=course.equip_id,
-        course_id=new_course.course_id
-    )
-    db.add(equipment_course_link)
+    return response
+
+# [관리자] 강의 일괄 등록 (커리큘럼 업로드용, 단일 트랜잭션)
+@router.post("/batch", response_model=List[schemas.Course], status_code=status.HTTP_201_CREATED)
+def create_courses_batch(
+    courses: List[schemas.CourseCreate],
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    if current_user.role != models.UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="관리자만 강의를 생성할 수 있습니다.")
+    if not courses:
+        return []
+
+    new_courses = _build_courses(courses, db)
+    db.flush() # course_id 할당
+    # commit 후에는 강의마다 SELECT가 다시 나가므로 commit 전에 응답을 직렬화
+    response = [schemas.Course.model_validate(new_course) for new_course in new_courses]
     db.commit()
 
-    return new_course
\ No newline at end of file
+    return response
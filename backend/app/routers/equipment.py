@@ -6,16 +6,17 @@ import logging
 
 router = APIRouter()
 
-# Add logging configuration
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @router.get("/", response_model=List[schemas.Equipment])
-def read_equipment(skip: int = 0, limit: int = 100, category: str = None, db: Session = Depends(database.get_db)):
+def read_equipment(skip: int = 0, limit: int = 100, category: str = None, sort: str = None, db: Session = Depends(database.get_read_db)):
     try:
         query = db.query(models.Equipment).options(joinedload(models.Equipment.instructor_user))
         if category and category != 'ALL':
             query = query.filter(models.Equipment.category == category)
+        # rating은 리뷰 등록 시 미리 갱신된 인덱스 컬럼이므로 정렬 시 집계가 필요 없음
+        if sort == 'rating':
+            query = query.order_by(models.Equipment.rating.desc(), models.Equipment.equip_id)
         return query.offset(skip).limit(limit).all()
     except Exception as e:
         logger.error(f"Error in read_equipment: {str(e)}")
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
 from typing import List
-from app import models, schemas, database, auth
+from app import models, schemas, database, auth, analytics
+from app.tasks import task_queue
 
 router = APIRouter()
 
@@ -21,13 +22,17 @@ def create_rental(rental: schemas.RentalCreate, current_user: models.User = Depe
         equip.available_qty -= 1
         
         db.add(db_rental)
+        analytics.record_rental_requested(db, rental.equip_id)
         db.commit()
         db.refresh(db_rental)
-        return db_rental
     except Exception as e:
         print(f"Error in create_rental: {str(e)}")
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
+    # 커밋 이후이므로 알림 등록에 실패해도 요청은 성공으로 응답 (실패는 task_queue가 기록)
+    task_queue.enqueue_after_commit("notify_instructor_new_rental", rental_id=db_rental.rental_id)
+    return db_rental
+
 
 # [사용자] 내 대여 목록
 @router.get("/my", response_model=List[schemas.Rental])
@@ -41,7 +46,7 @@ def read_my_rentals(current_user: models.User = Depends(auth.get_current_user),
 
 # [관리자] 전체 대여 요청 목록 (대기중인 건 위주)
 @router.get("/all", response_model=List[schemas.Rental])
-def read_all_rentals(current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(database.get_db)):
+def read_all_rentals(current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(database.get_read_db)):
     if current_user.role != models.UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다.")
     try:
@@ -65,9 +70,14 @@ def approve_rental(rental_id: int, current_user: models.User = Depends(auth.get_
         if not rental:
             raise HTTPException(status_code=404, detail="신청 건을 찾을 수 없습니다.")
         
+        if rental.status == models.RentalStatus.PENDING:
+            analytics.record_rental_approved(db, rental)
         rental.status = models.RentalStatus.APPROVED
         db.commit()
-        return {"message": "Approved successfully"}
     except Exception as e:
         print(f"Error in approve_rental: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+    # 커밋 이후이므로 알림 등록에 실패해도 요청은 성공으로 응답 (실패는 task_queue가 기록)
+    task_queue.enqueue_after_commit("notify_rental_approved", rental_id=rental_id)
+    return {"message": "Approved successfully"}
\ No newline at end of file
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+from typing import List
+from app import models, schemas, database, auth
+
+router = APIRouter()
+
+# 리뷰를 남길 수 있는 대여 상태 (실제로 장비를 받은 경우)
+REVIEWABLE_STATUSES = [models.RentalStatus.APPROVED, models.RentalStatus.RETURNED]
+
+@router.get("/", response_model=List[schemas.Review])
+def read_reviews(equip_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
+    return db.query(models.Review).options(joinedload(models.Review.user)).filter(
+        models.Review.equip_id == equip_id
+    ).order_by(models.Review.created_at.desc()).offset(skip).limit(limit).all()
+
+# [사용자] 리뷰 등록
+@router.post("/", response_model=schemas.Review, status_code=status.HTTP_201_CREATED)
+def create_review(
+    review: schemas.ReviewCreate,
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    equip_exists = db.query(models.Equipment.equip_id).filter(models.Equipment.equip_id == review.equip_id).first()
+    if not equip_exists:
+        raise HTTPException(status_code=404, detail="해당 장비를 찾을 수 없습니다.")
+
+    has_rented = db.query(models.Rental.rental_id).filter(
+        models.Rental.user_id == current_user.user_id,
+        models.Rental.equip_id == review.equip_id,
+        models.Rental.status.in_(REVIEWABLE_STATUSES)
+    ).first()
+    if not has_rented:
+        raise HTTPException(status_code=403, detail="대여 승인된 장비만 리뷰할 수 있습니다.")
+
+    already_reviewed = db.query(models.Review.review_id).filter(
+        models.Review.equip_id == review.equip_id,
+        models.Review.user_id == current_user.user_id
+    ).first()
+    if already_reviewed:
+        raise HTTPException(status_code=400, detail="이미 리뷰를 등록한 장비입니다.")
+
+    new_review = models.Review(
+        equip_id=review.equip_id,
+        user_id=current_user.user_id,
+        rating=review.rating,
+        comment=review.comment
+    )
+    db.add(new_review)
+
+    # 평균 평점/리뷰 수를 같은 트랜잭션에서 증분 갱신 (전체 리뷰 재집계 없음).
+    # 단일 UPDATE 문이라 동시 요청에서도 행 단위로 원자적으로 반영됨.
+    current_rating = func.coalesce(models.Equipment.rating, 0.0)
+    current_count = func.coalesce(models.Equipment.review_count, 0)
+    db.execute(
+        update(models.Equipment)
+        .where(models.Equipment.equip_id == review.equip_id)
+        .values(
+            rating=(current_rating * current_count + review.rating) / (current_count + 1),
+            review_count=current_count + 1
+        )
+        .execution_options(synchronize_session=False)
+    )
+    try:
+        db.commit()
+    except IntegrityError:
+        # 동시에 들어온 같은 사용자의 요청이 사전 검사를 통과한 경우 (uq_review_equip_user 위반)
+        db.rollback()
+        raise HTTPException(status_code=400, detail="이미 리뷰를 등록한 장비입니다.")
+    db.refresh(new_review)
+    return new_review
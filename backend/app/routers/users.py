@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from datetime import timedelta
 from app import models, schemas, database, auth
+from app.rate_limit import login_rate_limiter, signup_rate_limiter, refresh_rate_limiter
+from app.revocation import token_versions, use_refresh_token
 import logging
 
 router = APIRouter()
@@ -10,7 +11,7 @@ logger = logging.getLogger(__name__)
 
 ADMIN_SECRET_CODE = "team2002" # 관리자 인증 코드
 
-@router.post("/signup", response_model=schemas.User)
+@router.post("/signup", response_model=schemas.User, dependencies=[Depends(signup_rate_limiter)])
 def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
     db_user = db.query(models.User).filter(models.User.username == user.username).first()
     if db_user:
@@ -38,7 +39,7 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)
         db.rollback()
         raise HTTPException(status_code=500, detail="유저 생성 중 서버 오류가 발생했습니다.")
 
-@router.post("/login", response_model=schemas.Token)
+@router.post("/login", response_model=schemas.Token, dependencies=[Depends(login_rate_limiter)])
 def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(database.get_db)):
     user = db.query(models.User).filter(models.User.username == form_data.username).first()
     if not user or not auth.verify_password(form_data.password, user.password_hash):
@@ -48,12 +49,27 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = auth.create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
     # 응답에 role 정보도 포함해서 프론트가 알 수 있게 함
-    return {"access_token": access_token, "token_type": "bearer", "role": user.role}
+    return auth.create_token_pair(user, db)
+
+# 리프레시 토큰으로 액세스 토큰 재발급 (리프레시 토큰도 새로 발급하며, 제출된 토큰은 다시 사용할 수 없음)
+@router.post("/refresh", response_model=schemas.Token, dependencies=[Depends(refresh_rate_limiter)])
+def refresh_access_token(request: schemas.RefreshRequest, db: Session = Depends(database.get_db)):
+    payload = auth.decode_token(request.refresh_token, token_type="refresh")
+    user = db.get(models.User, payload["uid"]) if payload else None
+    if user is None or not use_refresh_token(db, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="리프레시 토큰이 유효하지 않습니다. 다시 로그인해주세요.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return auth.create_token_pair(user, db)
+
+# 모든 기기에서 로그아웃 (이전에 발급된 토큰 전부 폐기)
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(database.get_db)):
+    token_versions.bump(db, current_user.user_id)
+    db.commit()
 
 @router.get("/me", response_model=schemas.User)
 def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
@@ -75,7 +91,8 @@ def update_user_me(
     db.refresh(current_user)
     return current_user
 
-@router.put("/me/password", status_code=status.HTTP_204_NO_CONTENT)
+# 비밀번호 변경 후 현재 기기는 로그인 상태를 유지하도록 새 토큰을 발급해서 반환
+@router.put("/me/password", response_model=schemas.Token)
 def update_password_me(
     password_update: schemas.PasswordUpdate,
     current_user: models.User = Depends(auth.get_current_user),
@@ -86,5 +103,7 @@ def update_password_me(
     
     current_user.password_hash = auth.get_password_hash(password_update.new_password)
     db.add(current_user)
+    # 기존에 발급된 토큰은 모두 폐기 (다른 기기 세션 포함)
+    token_versions.bump(db, current_user.user_id)
     db.commit()
-    return {"message": "비밀번호가 성공적으로 변경되었습니다."}
\ No newline at end of file
+    return auth.create_token_pair(current_user, db)
\ No newline at end of file
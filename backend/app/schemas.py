@@ -1,15 +1,21 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 
 # --- Token ---
 class Token(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str
     role: str # 토큰 발급 시 역할 정보도 줌
 
 class TokenData(BaseModel):
     username: Optional[str] = None
+    user_id: Optional[int] = None
+    role: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 # --- User ---
 class UserBase(BaseModel):
@@ -88,13 +94,43 @@ class CourseBase(BaseModel):
     description: Optional[str] = None
 
 class CourseCreate(CourseBase): # 강의 등록용
-    equip_id: int # 연결할 장비 ID는 필수로 변경 (requirement 1.B.2)
+    # 연결할 장비 ID는 필수 (requirement 1.B.2). 단일 equip_id 또는 equip_ids 목록으로 지정
+    equip_id: Optional[int] = None
+    equip_ids: List[int] = []
+
+    @model_validator(mode="after")
+    def merge_equip_ids(self):
+        # 기존 클라이언트의 equip_id도 equip_ids에 합쳐서 처리 (중복 제거, 순서 유지)
+        ids = list(self.equip_ids)
+        if self.equip_id is not None:
+            ids.insert(0, self.equip_id)
+        self.equip_ids = list(dict.fromkeys(ids))
+        if not self.equip_ids:
+            raise ValueError("연결할 장비 ID(equip_id 또는 equip_ids)가 필요합니다.")
+        return self
 
 class Course(CourseBase):
     course_id: int
     class Config:
         from_attributes = True
 
+# --- Review ---
+class ReviewCreate(BaseModel):
+    equip_id: int
+    rating: int = Field(ge=1, le=5)
+    comment: Optional[str] = None
+
+class Review(BaseModel):
+    review_id: int
+    equip_id: int
+    user_id: int
+    rating: int
+    comment: Optional[str] = None
+    created_at: Optional[datetime] = None
+    user: Optional[User] = None
+    class Config:
+        from_attributes = True
+
 # --- ChatMessage ---
 class ChatMessageBase(BaseModel):
     sender_id: int
@@ -115,4 +151,40 @@ class ChatMessage(ChatMessageBase):
     rental: Optional[Rental] = None # Optional relationship to Rental
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# WebSocket 축약 형식 (format=compact). 방 참여자는 대여/장비 정보를 이미 알고 있으므로 제외
+class ChatMessageCompact(BaseModel):
+    id: int
+    sender_id: int
+    sender_name: Optional[str] = None
+    receiver_id: int
+    rental_id: int
+    message: str
+    timestamp: datetime
+
+# --- Analytics (관리자 통계) ---
+class EquipmentUtilization(BaseModel):
+    equip_id: int
+    name: str
+    category: str
+    total_qty: int
+    in_use: int
+    utilization: float
+    requested: int
+    approved: int
+
+class CategoryDemand(BaseModel):
+    category: str
+    requested: int
+    approved: int
+
+class PendingQueue(BaseModel):
+    pending: int
+    oldest_day: Optional[date] = None
+
+class ChatVolume(BaseModel):
+    day: date
+    message_count: int
+    class Config:
+        from_attributes = True
@@ -0,0 +1,285 @@
+import os
+import json
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# memory: 앱 프로세스 안의 asyncio 워커가 처리 (기본값)
+# durable: background_jobs 테이블에 저장하고 별도 워커 프로세스(worker.py)가 처리
+TASK_QUEUE_MODE = os.getenv("TASK_QUEUE_MODE", "memory")
+TASK_CONCURRENCY = int(os.getenv("TASK_CONCURRENCY", "4"))
+TASK_MAX_RETRIES = int(os.getenv("TASK_MAX_RETRIES", "3"))
+TASK_RETRY_DELAY = float(os.getenv("TASK_RETRY_DELAY", "1.0")) # seconds, 재시도마다 2배
+TASK_QUEUE_MAXSIZE = int(os.getenv("TASK_QUEUE_MAXSIZE", "10000"))
+# durable 모드: 이 시간(초)이 지나도록 RUNNING인 작업은 워커가 죽은 것으로 보고 다시 대기열로 돌림
+TASK_LEASE_TIMEOUT = float(os.getenv("TASK_LEASE_TIMEOUT", "300"))
+
+
+class TaskQueue:
+    """
+    커밋 이후의 부수 작업(알림, 집계 등)을 요청 처리 흐름 밖에서 실행하는 작업 큐.
+    라우터는 db.commit() 후 task_queue.enqueue_after_commit("작업이름", **kwargs)만 호출한다.
+    """
+    def __init__(self, mode: str = TASK_QUEUE_MODE, concurrency: int = TASK_CONCURRENCY,
+                 max_retries: int = TASK_MAX_RETRIES, retry_delay: float = TASK_RETRY_DELAY,
+                 maxsize: int = TASK_QUEUE_MAXSIZE):
+        self.mode = mode
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.maxsize = maxsize
+        self.handlers: Dict[str, Callable] = {}
+        # durable 모드에서도 앱 프로세스의 in-memory 큐로 실행하는 작업 (register(..., local=True))
+        self.local_handlers = set()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+        self._schedules = []
+        self._scheduler_tasks = []
+        # 큐 시작 전에 들어온 작업은 여기에 보관했다가 start() 시 넣음
+        self._pending = []
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {"enqueued": 0, "processed": 0, "failed": 0, "retried": 0, "dropped": 0}
+
+    def register(self, name: str, local: bool = False):
+        """
+        작업 핸들러 등록 데코레이터. 핸들러는 동기 함수이며 kwargs는 JSON 직렬화 가능해야 함.
+        local=True인 작업은 모드와 관계없이 항상 앱 프로세스에서 실행됨
+        (WebSocket 알림처럼 앱 프로세스의 상태가 필요해 worker.py에서는 실행할 수 없는 작업).
+        """
+        def decorator(func: Callable):
+            self.handlers[name] = func
+            if local:
+                self.local_handlers.add(name)
+            return func
+        return decorator
+
+    def schedule(self, name: str, interval: float, run_immediately: bool = False, **kwargs):
+        """
+        interval(초)마다 작업을 주기적으로 enqueue (앱 프로세스에서 start() 이후 동작).
+        run_immediately=True면 시작 직후 한 번 실행한 뒤 주기를 따름
+        (무료 플랜처럼 interval보다 먼저 인스턴스가 내려가는 환경에서도 실행되도록).
+        """
+        self._schedules.append((name, interval, run_immediately, kwargs))
+
+    def run_on_start(self, name: str, **kwargs):
+        """start() 직후 작업을 한 번만 enqueue"""
+        self._schedules.append((name, None, True, kwargs))
+
+    # --- 작업 등록 ---
+
+    def enqueue(self, name: str, **kwargs):
+        """작업을 큐에 넣음. 스레드풀에서 실행되는 동기 라우터에서도 안전하게 호출 가능."""
+        if name not in self.handlers:
+            raise ValueError(f"등록되지 않은 작업입니다: {name}")
+
+        if self.mode == "durable" and name not in self.local_handlers:
+            self._enqueue_durable(name, kwargs)
+            return
+
+        job = {"name": name, "kwargs": kwargs, "attempts": 0}
+        with self._lock:
+            self._stats["enqueued"] += 1
+            if self._loop is None:
+                self._pending.append(job)
+                return
+        self._loop.call_soon_threadsafe(self._put, job)
+
+    def enqueue_after_commit(self, name: str, **kwargs) -> bool:
+        """
+        커밋이 끝난 요청 처리 중에 작업을 넣을 때 사용. 실패해도 예외를 던지지 않고 기록만 함
+        (durable 모드의 INSERT 실패 등으로 이미 커밋된 요청이 500이 되어 클라이언트가 재시도하는 것을 방지).
+        """
+        try:
+            self.enqueue(name, **kwargs)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to enqueue task {name} {kwargs}: {e!r}", exc_info=True)
+            return False
+
+    def _enqueue_durable(self, name: str, kwargs: dict):
+        from . import models, database
+
+        db = database.SessionLocal()
+        try:
+            db.add(models.BackgroundJob(name=name, payload=json.dumps(kwargs)))
+            db.commit()
+            self._stats["enqueued"] += 1
+        finally:
+            db.close()
+
+    def _put(self, job: dict):
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            logger.error(f"Task queue full, dropping job {job['name']}")
+
+    # --- in-memory 워커 ---
+
+    async def start(self):
+        """FastAPI startup 시 호출. 주기 작업 스케줄러를 띄우고, memory 모드(또는 local 작업이 있으면)에서는 워커도 띄움."""
+        if self._scheduler_tasks or self._workers:
+            return
+        self._scheduler_tasks = [
+            asyncio.create_task(self._run_schedule(name, interval, run_immediately, kwargs))
+            for name, interval, run_immediately, kwargs in self._schedules
+        ]
+        if self.mode != "memory" and not self.local_handlers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            pending, self._pending = self._pending, []
+        for job in pending:
+            self._put(job)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        logger.info(f"Task queue started with {self.concurrency} workers.")
+
+    async def stop(self):
+        """FastAPI shutdown 시 호출. 남은 작업은 처리하지 않고 워커를 종료."""
+        tasks = self._workers + self._scheduler_tasks
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._scheduler_tasks = []
+        with self._lock:
+            self._loop = None
+        self._queue = None
+
+    async def _run_schedule(self, name: str, interval: Optional[float], run_immediately: bool, kwargs: dict):
+        if not run_immediately:
+            await asyncio.sleep(interval)
+        while True:
+            try:
+                # durable 모드에서는 DB INSERT가 일어나므로 스레드에서 실행
+                await asyncio.to_thread(self.enqueue, name, **kwargs)
+            except Exception as e:
+                logger.error(f"Failed to enqueue scheduled task {name}: {e}")
+            if interval is None: # run_on_start
+                return
+            await asyncio.sleep(interval)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            self._in_flight += 1
+            try:
+                await asyncio.to_thread(self.handlers[job["name"]], **job["kwargs"])
+                self._stats["processed"] += 1
+            except Exception as e:
+                job["attempts"] += 1
+                if job["attempts"] <= self.max_retries:
+                    self._stats["retried"] += 1
+                    delay = self.retry_delay * (2 ** (job["attempts"] - 1))
+                    logger.warning(f"Task {job['name']} failed ({e}), retrying in {delay}s")
+                    self._loop.call_later(delay, self._put, job)
+                else:
+                    self._stats["failed"] += 1
+                    logger.error(f"Task {job['name']} failed after {job['attempts']} attempts: {e}", exc_info=True)
+            finally:
+                self._in_flight -= 1
+                self._queue.task_done()
+
+    # --- durable 워커 (worker.py에서 사용) ---
+
+    def run_durable_once(self, db) -> bool:
+        """대기 중인 작업 하나를 선점해 실행. 처리한 작업이 있으면 True."""
+        from . import models
+
+        now = datetime.utcnow()
+        self.requeue_stale(db, now)
+        job = db.query(models.BackgroundJob).filter(
+            models.BackgroundJob.status == models.JobStatus.PENDING,
+            models.BackgroundJob.run_after <= now
+        ).order_by(models.BackgroundJob.id).first()
+        if job is None:
+            return False
+
+        # 다른 워커가 먼저 가져간 경우 rowcount가 0
+        claimed = db.query(models.BackgroundJob).filter(
+            models.BackgroundJob.id == job.id,
+            models.BackgroundJob.status == models.JobStatus.PENDING
+        ).update({"status": models.JobStatus.RUNNING, "claimed_at": now}, synchronize_session=False)
+        db.commit()
+        if not claimed:
+            return True
+
+        db.refresh(job)
+        try:
+            self.handlers[job.name](**json.loads(job.payload or "{}"))
+            job.status = models.JobStatus.DONE
+            self._stats["processed"] += 1
+        except Exception as e:
+            job.attempts += 1
+            job.last_error = str(e)
+            if job.attempts <= self.max_retries:
+                job.status = models.JobStatus.PENDING
+                job.run_after = now + timedelta(seconds=self.retry_delay * (2 ** (job.attempts - 1)))
+                self._stats["retried"] += 1
+            else:
+                job.status = models.JobStatus.FAILED
+                self._stats["failed"] += 1
+            logger.error(f"Task {job.name} (id={job.id}) failed: {e}", exc_info=True)
+        db.commit()
+        return True
+
+    def requeue_stale(self, db, now: datetime = None) -> int:
+        """임대 시간(lease)이 지난 RUNNING 작업을 실패 1회로 계산해 다시 대기열에 넣음 (재시도 초과 시 FAILED)"""
+        from . import models
+
+        now = now or datetime.utcnow()
+        stale = (
+            (models.BackgroundJob.status == models.JobStatus.RUNNING)
+            & (models.BackgroundJob.claimed_at < now - timedelta(seconds=TASK_LEASE_TIMEOUT))
+        )
+        failed = db.query(models.BackgroundJob).filter(
+            stale, models.BackgroundJob.attempts >= self.max_retries
+        ).update({
+            "status": models.JobStatus.FAILED,
+            "attempts": models.BackgroundJob.attempts + 1,
+            "last_error": "lease expired (worker died?)",
+        }, synchronize_session=False)
+        requeued = db.query(models.BackgroundJob).filter(stale).update({
+            "status": models.JobStatus.PENDING,
+            "attempts": models.BackgroundJob.attempts + 1,
+            "last_error": "lease expired (worker died?)",
+            "run_after": now,
+        }, synchronize_session=False)
+        db.commit()
+        if failed or requeued:
+            logger.warning(f"Recovered stale jobs: {requeued} requeued, {failed} failed")
+        return requeued + failed
+
+    # --- 지표 ---
+
+    def metrics(self) -> dict:
+        """큐 길이, 처리 중인 작업 수 및 누적 처리 통계"""
+        if self.mode == "durable":
+            from . import models, database
+
+            db = database.SessionLocal()
+            try:
+                depth = db.query(models.BackgroundJob).filter(
+                    models.BackgroundJob.status == models.JobStatus.PENDING
+                ).count()
+                in_flight = db.query(models.BackgroundJob).filter(
+                    models.BackgroundJob.status == models.JobStatus.RUNNING
+                ).count()
+            finally:
+                db.close()
+        else:
+            depth = (self._queue.qsize() if self._queue is not None else 0) + len(self._pending)
+            in_flight = self._in_flight
+        return {"mode": self.mode, "depth": depth, "in_flight": in_flight,
+                "concurrency": self.concurrency, **self._stats}
+
+
+task_queue = TaskQueue()
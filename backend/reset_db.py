@@ -29,4 +29,6 @@ def reset_db():
     print("New tables created successfully based on models.py schema.")
 
 if __name__ == "__main__":
+    # 빈 DB 대신 합성 데이터가 필요하면: python seed_db.py seed --scale N --snapshot base
+    # 이후에는 python seed_db.py restore base 로 즉시 복원
     reset_db()
@@ -0,0 +1,286 @@
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+from datetime import datetime, timedelta
+
+# Add the backend directory to the sys.path to allow importing app modules
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from sqlalchemy import insert, text, create_engine
+from sqlalchemy.engine import make_url
+
+from app.database import Base, engine, SessionLocal, SQLALCHEMY_DATABASE_URL
+from app import models, auth, analytics
+
+# 스냅샷 파일(SQLite) 저장 위치
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "snapshots")
+
+# scale=1 기준 데이터 개수 (scale 배수로 증가)
+BASE_COUNTS = {
+    "users": 50,
+    "equipment": 20,
+    "courses": 30,
+    "rentals": 200,
+    "chat_messages": 1000,
+}
+
+CATEGORIES = ["구기", "라켓", "수상", "육상", "체조", "아웃도어"]
+CONTENT_TYPES = ["VIDEO", "DOCUMENT"]
+RENTAL_STATUSES = [s.value for s in models.RentalStatus]
+
+# 모든 시드 유저가 공유하는 비밀번호 (bcrypt 해시는 한 번만 계산)
+SEED_PASSWORD = "password123"
+
+
+def _sqlite_path(url: str):
+    """SQLite URL이면 DB 파일의 절대 경로를, 아니면 None 반환"""
+    parsed = make_url(url)
+    if not parsed.drivername.startswith("sqlite") or not parsed.database or parsed.database == ":memory:":
+        return None
+    # engine과 동일하게 현재 작업 디렉터리 기준으로 해석
+    return os.path.abspath(parsed.database)
+
+
+def reset_schema():
+    """모든 테이블을 삭제 후 재생성 (파일 삭제 없이 DROP/CREATE)"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def _bulk_insert(db, model, rows, chunk_size=5000):
+    for start in range(0, len(rows), chunk_size):
+        db.execute(insert(model), rows[start:start + chunk_size])
+
+
+def seed(scale: int = 1, seed_value: int = 42):
+    """
+    scale 배수만큼의 결정적(deterministic) 합성 데이터셋을 벌크 INSERT로 생성.
+    동일한 scale/seed_value 조합은 항상 동일한 데이터를 만든다.
+    """
+    rng = random.Random(seed_value)
+    counts = {name: count * scale for name, count in BASE_COUNTS.items()}
+    base_time = datetime(2025, 1, 1, 9, 0, 0)
+    password_hash = auth.get_password_hash(SEED_PASSWORD)
+
+    # PK를 직접 지정해서 relationship 조회 없이 FK를 연결
+    admin_count = max(1, counts["users"] // 10)
+    users = [
+        {
+            "user_id": i,
+            "username": f"admin{i}" if i <= admin_count else f"user{i}",
+            "password_hash": password_hash,
+            "affiliation": f"기관{rng.randint(1, 20)}",
+            "name": f"사용자{i}",
+            "role": models.UserRole.ADMIN.value if i <= admin_count else models.UserRole.USER.value,
+        }
+        for i in range(1, counts["users"] + 1)
+    ]
+
+    equipment = []
+    for i in range(1, counts["equipment"] + 1):
+        total_qty = rng.randint(5, 50)
+        equipment.append({
+            "equip_id": i,
+            "name": f"장비{i}",
+            "category": rng.choice(CATEGORIES),
+            "instructor_id": rng.randint(1, admin_count),
+            "rating": 0.0,
+            "review_count": 0,
+            "badge": rng.choice([None, "BEST", "NEW"]),
+            "total_qty": total_qty,
+            "available_qty": total_qty,
+            "rental_fee": rng.randrange(0, 50000, 1000),
+            "description": f"장비{i} 설명",
+            "image_url": None,
+        })
+
+    courses = []
+    equipment_courses = []
+    for i in range(1, counts["courses"] + 1):
+        courses.append({
+            "course_id": i,
+            "title": f"강의{i}",
+            "description": f"강의{i} 설명",
+            "content_type": rng.choice(CONTENT_TYPES),
+            "duration": f"{rng.randint(5, 90)}분",
+            "content_url": f"https://example.com/courses/{i}",
+        })
+        equipment_courses.append({
+            "course_id": i,
+            "equip_id": rng.randint(1, counts["equipment"]),
+        })
+
+    rentals = []
+    for i in range(1, counts["rentals"] + 1):
+        start_date = base_time + timedelta(days=rng.randint(0, 365), hours=rng.randint(0, 23))
+        status = rng.choice(RENTAL_STATUSES)
+        equip = equipment[rng.randrange(counts["equipment"])]
+        if status in (models.RentalStatus.PENDING.value, models.RentalStatus.APPROVED.value) and equip["available_qty"] > 0:
+            equip["available_qty"] -= 1
+        rentals.append({
+            "rental_id": i,
+            "user_id": rng.randint(admin_count + 1, counts["users"]) if counts["users"] > admin_count else 1,
+            "equip_id": equip["equip_id"],
+            "start_date": start_date,
+            "end_date": start_date + timedelta(days=rng.randint(1, 14)),
+            "status": status,
+            "reason": "시드 데이터",
+            "created_at": start_date - timedelta(days=1),
+        })
+
+    chat_messages = []
+    for i in range(1, counts["chat_messages"] + 1):
+        rental = rentals[rng.randrange(counts["rentals"])]
+        instructor_id = equipment[rental["equip_id"] - 1]["instructor_id"]
+        from_renter = rng.random() < 0.5
+        chat_messages.append({
+            "id": i,
+            "sender_id": rental["user_id"] if from_renter else instructor_id,
+            "receiver_id": instructor_id if from_renter else rental["user_id"],
+            "rental_id": rental["rental_id"],
+            "message": f"메시지 {i}",
+            "timestamp": rental["created_at"] + timedelta(minutes=rng.randint(0, 60 * 24 * 7)),
+        })
+
+    db = SessionLocal()
+    try:
+        _bulk_insert(db, models.User, users)
+        _bulk_insert(db, models.Equipment, equipment)
+        _bulk_insert(db, models.Course, courses)
+        _bulk_insert(db, models.EquipmentCourse, equipment_courses)
+        _bulk_insert(db, models.Rental, rentals)
+        _bulk_insert(db, models.ChatMessage, chat_messages)
+        # 관리자 통계 집계 테이블도 시드 데이터 기준으로 채움
+        analytics.rebuild_rollups(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    # Postgres는 PK를 직접 넣었으므로 시퀀스를 최댓값으로 맞춰야 이후 INSERT가 충돌하지 않음
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                # 정수 autoincrement PK만 대상 (daily_chat_stats.day, user_token_versions.user_id 등은 시퀀스 없음)
+                pk_column = table.autoincrement_column
+                if pk_column is None:
+                    continue
+                sequence = conn.execute(
+                    text("SELECT pg_get_serial_sequence(:table, :column)"),
+                    {"table": table.name, "column": pk_column.name}
+                ).scalar()
+                if sequence is None:
+                    continue
+                conn.execute(text(
+                    f"SELECT setval(:sequence, COALESCE((SELECT MAX({pk_column.name}) FROM {table.name}), 1))"
+                ), {"sequence": sequence})
+
+    return counts
+
+
+def _pg_admin_engine():
+    """CREATE/DROP DATABASE 실행용 (postgres 관리 DB, AUTOCOMMIT)"""
+    url = make_url(SQLALCHEMY_DATABASE_URL).set(database="postgres")
+    return create_engine(url, isolation_level="AUTOCOMMIT")
+
+
+def _pg_snapshot_name(name: str):
+    return f"{make_url(SQLALCHEMY_DATABASE_URL).database}_snap_{name}"
+
+
+def snapshot(name: str = "default"):
+    """
+    현재 DB를 스냅샷으로 저장.
+    SQLite는 파일 복사, Postgres는 현재 DB를 TEMPLATE으로 하는 새 DB 생성.
+    """
+    engine.dispose()
+    db_path = _sqlite_path(SQLALCHEMY_DATABASE_URL)
+    if db_path:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        target = os.path.join(SNAPSHOT_DIR, f"{name}.db")
+        shutil.copyfile(db_path, target)
+        return target
+
+    if engine.dialect.name == "postgresql":
+        source = make_url(SQLALCHEMY_DATABASE_URL).database
+        target = _pg_snapshot_name(name)
+        admin_engine = _pg_admin_engine()
+        with admin_engine.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{target}"'))
+            conn.execute(text(f'CREATE DATABASE "{target}" TEMPLATE "{source}"'))
+        admin_engine.dispose()
+        return target
+
+    raise RuntimeError(f"스냅샷을 지원하지 않는 DB입니다: {engine.dialect.name}")
+
+
+def restore(name: str = "default"):
+    """snapshot()으로 저장한 상태로 DB를 되돌림"""
+    engine.dispose()
+    db_path = _sqlite_path(SQLALCHEMY_DATABASE_URL)
+    if db_path:
+        source = os.path.join(SNAPSHOT_DIR, f"{name}.db")
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"스냅샷 파일이 없습니다: {source}")
+        shutil.copyfile(source, db_path)
+        return db_path
+
+    if engine.dialect.name == "postgresql":
+        target = make_url(SQLALCHEMY_DATABASE_URL).database
+        source = _pg_snapshot_name(name)
+        admin_engine = _pg_admin_engine()
+        with admin_engine.connect() as conn:
+            # 대상 DB에 남아있는 커넥션을 끊어야 DROP 가능
+            conn.execute(text(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE datname = :db AND pid <> pg_backend_pid()"
+            ), {"db": target})
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{target}"'))
+            conn.execute(text(f'CREATE DATABASE "{target}" TEMPLATE "{source}"'))
+        admin_engine.dispose()
+        return target
+
+    raise RuntimeError(f"스냅샷을 지원하지 않는 DB입니다: {engine.dialect.name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="테스트/벤치마크용 DB 시드 및 스냅샷 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = subparsers.add_parser("seed", help="스키마 재생성 후 합성 데이터 생성")
+    seed_parser.add_argument("--scale", type=int, default=1, help="데이터 규모 배수 (기본 1)")
+    seed_parser.add_argument("--seed", type=int, default=42, help="난수 시드 (기본 42)")
+    seed_parser.add_argument("--snapshot", default=None, help="생성 후 이 이름으로 스냅샷 저장")
+
+    snapshot_parser = subparsers.add_parser("snapshot", help="현재 DB를 스냅샷으로 저장")
+    snapshot_parser.add_argument("name", nargs="?", default="default")
+
+    restore_parser = subparsers.add_parser("restore", help="스냅샷으로 DB 복원")
+    restore_parser.add_argument("name", nargs="?", default="default")
+
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+
+    if args.command == "seed":
+        reset_schema()
+        counts = seed(scale=args.scale, seed_value=args.seed)
+        print(f"Seeded {counts} in {time.perf_counter() - started:.2f}s")
+        if args.snapshot:
+            snap_started = time.perf_counter()
+            target = snapshot(args.snapshot)
+            print(f"Snapshot '{target}' saved in {time.perf_counter() - snap_started:.3f}s")
+    elif args.command == "snapshot":
+        target = snapshot(args.name)
+        print(f"Snapshot '{target}' saved in {time.perf_counter() - started:.3f}s")
+    elif args.command == "restore":
+        target = restore(args.name)
+        print(f"Restored '{target}' in {time.perf_counter() - started:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import subprocess
+import urllib.request
+from datetime import datetime
+
+BACKEND_DIR = os.path.abspath(os.path.dirname(__file__))
+
+# 프로세스 시작부터 첫 라우터 응답(애플리케이션 로드 완료)까지 허용하는 시간 (ms)
+COLD_START_BUDGET_MS = float(os.getenv("COLD_START_BUDGET_MS", "3000"))
+
+
+def _env():
+    env = os.environ.copy()
+    env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def profile_imports(module: str = "app.main", top: int = 25):
+    """python -X importtime으로 module을 import하고 누적 시간이 큰 순서로 모듈 목록을 반환"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} 실패:\n{result.stderr[-2000:]}")
+
+    # 형식: "import time:       self [us] |  cumulative | imported package"
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    total_ms = sum(entry["self_ms"] for entry in entries)
+    entries.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+    return total_ms, entries[:top]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url: str, started: float, timeout: float, process, request_timeout: float = 1.0):
+    """url이 200을 반환할 때까지 재시도하고, started부터의 경과 시간(ms)을 반환"""
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"서버 프로세스가 종료되었습니다 (exit code {process.returncode})")
+        try:
+            with urllib.request.urlopen(url, timeout=request_timeout) as response:
+                if response.status == 200:
+                    return (time.perf_counter() - started) * 1000
+        except OSError:
+            time.sleep(0.01)
+    raise TimeoutError(f"{timeout}초 안에 {url}이(가) 성공하지 않았습니다.")
+
+
+def measure_cold_start(health_path: str = "/health", routed_path: str = "/api/equipment/", timeout: float = 60.0):
+    """
+    uvicorn 프로세스를 새로 띄워서 (첫 헬스 체크 응답, 첫 라우터 응답)까지 걸린 시간(ms)을 측정.
+    헬스 체크는 애플리케이션 로드(테이블 생성, 라우터 import, 토큰 동기화) 전에 응답하므로,
+    로드 비용은 라우터 경로의 첫 응답 시간으로 확인한다.
+    """
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        health_ms = _wait_for(base_url + health_path, started, timeout, process)
+        # 로드가 끝날 때까지 요청이 대기하므로 요청 타임아웃을 길게 잡음
+        routed_ms = _wait_for(base_url + routed_path, started, timeout, process, request_timeout=timeout)
+        return health_ms, routed_ms
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="import 시간 및 콜드 스타트 측정 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    imports_parser = subparsers.add_parser("imports", help="모듈별 import 시간 리포트")
+    imports_parser.add_argument("--module", default="app.main")
+    imports_parser.add_argument("--top", type=int, default=25)
+
+    cold_parser = subparsers.add_parser("coldstart", help="프로세스 시작 ~ 첫 헬스 체크 / 첫 라우터 응답 시간 측정")
+    cold_parser.add_argument("--runs", type=int, default=3)
+    cold_parser.add_argument("--path", default="/api/equipment/", help="애플리케이션 로드가 필요한 경로 (예산 비교 대상)")
+    cold_parser.add_argument("--budget-ms", type=float, default=COLD_START_BUDGET_MS)
+    cold_parser.add_argument("--output", default=None, help="결과를 JSON 한 줄로 이어 쓸 파일 (추이 기록용)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "imports":
+        total_ms, entries = profile_imports(args.module, args.top)
+        print(f"Total import time for {args.module}: {total_ms:.1f} ms")
+        print(f"{'cumulative(ms)':>15} {'self(ms)':>10}  module")
+        for entry in entries:
+            print(f"{entry['cumulative_ms']:>15.1f} {entry['self_ms']:>10.1f}  {'  ' * entry['depth']}{entry['module']}")
+        return 0
+
+    timings = [measure_cold_start(routed_path=args.path) for _ in range(args.runs)]
+    best_health_ms = min(health_ms for health_ms, _ in timings)
+    best_ms = min(routed_ms for _, routed_ms in timings)
+    # 예산은 실제 요청을 처리할 수 있게 된 시점(첫 라우터 응답) 기준
+    within_budget = best_ms <= args.budget_ms
+    print(f"First health check (ms): {', '.join(f'{h:.0f}' for h, _ in timings)} | best {best_health_ms:.0f}")
+    print(f"First {args.path} (ms): {', '.join(f'{r:.0f}' for _, r in timings)} | best {best_ms:.0f}"
+          f" | budget {args.budget_ms:.0f} -> {'OK' if within_budget else 'OVER BUDGET'}")
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps({
+                "measured_at": datetime.utcnow().isoformat(),
+                "path": args.path,
+                "health_ms": [round(h, 1) for h, _ in timings],
+                "runs_ms": [round(r, 1) for _, r in timings],
+                "best_health_ms": round(best_health_ms, 1),
+                "best_ms": round(best_ms, 1),
+                "budget_ms": args.budget_ms,
+            }) + "\n")
+    return 0 if within_budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the backend directory to the sys.path to allow importing app modules
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app import models, database
+from app.tasks import task_queue
+from app import jobs # 작업 핸들러 등록
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _worker_loop(poll_interval: float):
+    """background_jobs 테이블을 폴링하며 작업을 하나씩 선점해 실행"""
+    db = database.SessionLocal()
+    try:
+        while True:
+            try:
+                if not task_queue.run_durable_once(db):
+                    time.sleep(poll_interval)
+            except Exception as e:
+                # DB 오류 등으로 스레드가 조용히 죽지 않도록 롤백 후 계속 폴링
+                logger.error(f"Worker loop error: {e}", exc_info=True)
+                db.rollback()
+                time.sleep(poll_interval)
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="durable 모드(TASK_QUEUE_MODE=durable) 작업 큐 워커")
+    parser.add_argument("--concurrency", type=int, default=task_queue.concurrency, help="동시 실행 작업 수")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="대기 작업이 없을 때 폴링 간격(초)")
+    args = parser.parse_args(argv)
+
+    models.Base.metadata.create_all(bind=database.engine)
+    logger.info(f"Task worker started with {args.concurrency} threads.")
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [executor.submit(_worker_loop, args.poll_interval) for _ in range(args.concurrency)]
+        for future in futures:
+            # _worker_loop는 정상적으로 끝나지 않으므로 반환되면 원인을 남김
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Worker thread exited: {e}", exc_info=True)
+        logger.error("All worker threads exited.")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ import DetailModal from './components/Detailmodal';
 import AdminDashboard from './pages/AdminDashboard';
 import MyPage from './pages/MyPage';
 import Classroom from './pages/Classroom';
-import { apiClient } from './api/client';
+import { apiClient, WEBSOCKET_URL } from './api/client';
 
 export const UserContext = createContext(null);
 
@@ -27,6 +27,32 @@ export default function App() {
     }
   }, []);
 
+  // 로그인 상태에서는 알림 전용 소켓으로 서버 푸시(대여 신청/승인)를 받음
+  // user는 /api/users/me 성공(필요하면 토큰 재발급 포함) 후에 설정되므로 이 시점의 액세스 토큰은 유효함
+  useEffect(() => {
+    const token = localStorage.getItem('access_token');
+    if (!user || !token) return;
+
+    const ws = new WebSocket(`${WEBSOCKET_URL}/api/chat/ws/notifications?token=${token}`);
+    ws.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      if (data.type !== 'notification') return;
+      if (data.event === 'rental_approved') {
+        alert("대여 신청이 승인되었습니다!");
+        fetchMyRentals();
+      } else if (data.event === 'rental_requested') {
+        alert("담당 장비에 새 대여 신청이 들어왔습니다.");
+      }
+    };
+    ws.onerror = (error) => {
+      console.error('Notification WebSocket Error:', error);
+    };
+
+    return () => {
+      ws.close();
+    };
+  }, [user?.user_id]);
+
   const fetchEquipment = async () => {
     try {
       const data = await apiClient.get('/api/equipment/');
@@ -63,13 +89,21 @@ export default function App() {
     try {
       const data = await apiClient.post('/api/users/login', params, 'application/x-www-form-urlencoded');
       localStorage.setItem('access_token', data.access_token);
+      localStorage.setItem('refresh_token', data.refresh_token);
       fetchUserInfo();
     } catch (err) { alert("로그인 실패: " + err.message); }
   };
 
-  const handleLogout = () => {
+  const handleLogout = async () => {
+    // 서버에서도 토큰을 폐기해야 남은 리프레시 토큰으로 재발급받을 수 없음
+    if (localStorage.getItem('access_token')) {
+      try {
+        await apiClient.post('/api/users/logout');
+      } catch (err) { console.error(err); }
+    }
     setUser(null);
     localStorage.removeItem('access_token');
+    localStorage.removeItem('refresh_token');
     setView('login');
   };
 
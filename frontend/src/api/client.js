@@ -1,10 +1,60 @@
 const BASE_URL = import.meta.env.VITE_API_URL || '';
 
+// WebSocket URL을 VITE_API_URL에서 동적으로 생성
+const getWebSocketURL = () => {
+  const apiUrl = import.meta.env.VITE_API_URL;
+  if (apiUrl) {
+    // 프로덕션 환경: http(s)://를 ws(s)://로 변경
+    return apiUrl.replace(/^http/, 'ws');
+  }
+  // 로컬 개발 환경
+  return 'ws://127.0.0.1:8000';
+};
+
+export const WEBSOCKET_URL = getWebSocketURL();
+
 // 로컬 스토리지에서 토큰 가져오기
 const getToken = () => localStorage.getItem('access_token');
 
+// 동시에 여러 요청이 401을 받아도 재발급은 한 번만 요청하도록 진행 중인 요청을 공유
+let refreshPromise = null;
+
+// 액세스 토큰 만료 시 리프레시 토큰으로 재발급 (성공하면 true)
+const refreshAccessToken = () => {
+  if (!refreshPromise) {
+    refreshPromise = requestTokenRefresh().finally(() => {
+      refreshPromise = null;
+    });
+  }
+  return refreshPromise;
+};
+
+const requestTokenRefresh = async () => {
+  const refreshToken = localStorage.getItem('refresh_token');
+  if (!refreshToken) return false;
+  try {
+    const response = await fetch(`${BASE_URL}/api/users/refresh`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    });
+    if (!response.ok) {
+      // 리프레시 토큰은 한 번만 사용 가능하므로, 다른 탭이 먼저 재발급했다면 그 토큰을 사용
+      if (localStorage.getItem('refresh_token') !== refreshToken) return true;
+      localStorage.removeItem('refresh_token');
+      return false;
+    }
+    const data = await response.json();
+    localStorage.setItem('access_token', data.access_token);
+    localStorage.setItem('refresh_token', data.refresh_token);
+    return true;
+  } catch {
+    return false;
+  }
+};
+
 // 기본 요청 함수
-const request = async (method, endpoint, body = null, contentType = 'application/json') => {
+const request = async (method, endpoint, body = null, contentType = 'application/json', retried = false) => {
   const token = getToken();
   const headers = {};
 
@@ -37,6 +87,11 @@ const request = async (method, endpoint, body = null, contentType = 'application
 
   try {
     const response = await fetch(`${BASE_URL}${endpoint}`, config);
+
+    // 401이면 토큰을 한 번 재발급 받아 같은 요청을 다시 시도
+    if (response.status === 401 && token && !retried && await refreshAccessToken()) {
+      return request(method, endpoint, body, contentType, true);
+    }
     
     // 응답이 성공적이지 않으면 에러 던짐
     if (!response.ok) {
@@ -74,15 +129,32 @@ export const apiClient = {
 
 // New API calls for user management
 export const updateUser = (userData) => apiClient.put('/api/users/me', userData);
-export const updatePassword = (passwordData) => apiClient.put('/api/users/me/password', passwordData);
+// 비밀번호를 바꾸면 기존 토큰이 모두 폐기되므로 응답으로 받은 새 토큰을 저장
+export const updatePassword = async (passwordData) => {
+  const data = await apiClient.put('/api/users/me/password', passwordData);
+  localStorage.setItem('access_token', data.access_token);
+  localStorage.setItem('refresh_token', data.refresh_token);
+  return data;
+};
 
 // New API calls for courses
 export const createCourseAdmin = (courseData) => apiClient.post('/api/courses/', courseData);
+export const createCoursesBatchAdmin = (coursesData) => apiClient.post('/api/courses/batch', coursesData);
 export const fetchMyCourses = () => apiClient.get('/api/courses/my');
 
+// New API calls for reviews
+export const getReviews = (equipId) => apiClient.get(`/api/reviews/?equip_id=${equipId}`);
+export const createReview = (reviewData) => apiClient.post('/api/reviews/', reviewData);
+
 // New API calls for chat
 export const fetchChatHistory = (otherUserId) => apiClient.get(`/api/chat/history/${otherUserId}`);
 export const fetchChatRoomsAdmin = () => apiClient.get('/api/chat/rooms');
 
 // New API calls for signup
-export const signupUser = (userData) => apiClient.post('/api/users/signup', userData);
\ No newline at end of file
+export const signupUser = (userData) => apiClient.post('/api/users/signup', userData);
+
+// New API calls for admin analytics
+export const fetchUtilizationStats = (days = 30) => apiClient.get(`/api/analytics/utilization?days=${days}`);
+export const fetchDemandStats = (days = 30) => apiClient.get(`/api/analytics/demand?days=${days}`);
+export const fetchPendingQueue = () => apiClient.get('/api/analytics/pending');
+export const fetchChatVolume = (days = 30) => apiClient.get(`/api/analytics/chat-volume?days=${days}`);
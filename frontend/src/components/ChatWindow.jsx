@@ -1,21 +1,8 @@
 import React, { useState, useEffect, useRef, useContext } from 'react'; // Added useContext
 import { Send, X } from 'lucide-react';
-import { apiClient } from '../api/client';
+import { apiClient, WEBSOCKET_URL } from '../api/client';
 import { UserContext } from '../App'; // Import UserContext
 
-// WebSocket URL을 VITE_API_URL에서 동적으로 생성
-const getWebSocketURL = () => {
-  const apiUrl = import.meta.env.VITE_API_URL;
-  if (apiUrl) {
-    // 프로덕션 환경: http(s)://를 ws(s)://로 변경
-    return apiUrl.replace(/^http/, 'ws');
-  }
-  // 로컬 개발 환경
-  return 'ws://127.0.0.1:8000';
-};
-
-const WEBSOCKET_URL = getWebSocketURL();
-
 export default function ChatWindow({ rentalId, userId, onClose }) {
   const { user } = useContext(UserContext); // Get user from context
   const [messages, setMessages] = useState([]);
@@ -34,41 +21,54 @@ export default function ChatWindow({ rentalId, userId, onClose }) {
   useEffect(() => {
     if (!rentalId || !userId) return;
 
-    apiClient.get(`/api/chat/history/${rentalId}`)
-      .then(history => setMessages(history))
-      .catch(err => console.error("Failed to fetch chat history:", err));
-
-    const token = localStorage.getItem('access_token');
-    if (!token) {
-      console.error("Authentication token not found.");
-      return;
-    }
-
-    const wsUrl = `${WEBSOCKET_URL}/api/chat/ws/${rentalId}?token=${token}`;
-    console.log("Connecting to WebSocket:", wsUrl); // Log the URL
-    const ws = new WebSocket(wsUrl);
-    setSocket(ws);
+    let ws = null;
+    let cancelled = false;
 
-    ws.onopen = () => {
-      console.log(`WebSocket connected for rental room: ${rentalId}`);
-    };
-
-    ws.onmessage = (event) => {
-      console.log("WebSocket message received:", event.data); // Added log
-      const receivedMessage = JSON.parse(event.data);
-      setMessages(prev => [...prev, receivedMessage]);
-    };
-
-    ws.onclose = (event) => {
-      console.log(`WebSocket disconnected from rental room: ${rentalId}`, event.reason, event.code);
+    const connect = () => {
+      const token = localStorage.getItem('access_token');
+      if (!token) {
+        console.error("Authentication token not found.");
+        return;
+      }
+
+      // format=compact: 중첩된 사용자/대여 정보 없이 축약된 메시지를 받음
+      const wsUrl = `${WEBSOCKET_URL}/api/chat/ws/${rentalId}?token=${token}&format=compact`;
+      console.log("Connecting to WebSocket:", wsUrl); // Log the URL
+      ws = new WebSocket(wsUrl);
+      setSocket(ws);
+
+      ws.onopen = () => {
+        console.log(`WebSocket connected for rental room: ${rentalId}`);
+      };
+
+      ws.onmessage = (event) => {
+        console.log("WebSocket message received:", event.data); // Added log
+        const receivedMessage = JSON.parse(event.data);
+        // 서버 푸시 알림(대여 승인 등)은 App의 알림 소켓에서 처리하므로 채팅 목록에 추가하지 않음
+        if (receivedMessage.type === 'notification') return;
+        setMessages(prev => [...prev, receivedMessage]);
+      };
+
+      ws.onclose = (event) => {
+        console.log(`WebSocket disconnected from rental room: ${rentalId}`, event.reason, event.code);
+      };
+
+      ws.onerror = (error) => {
+        console.error('WebSocket Error:', error);
+      };
     };
 
-    ws.onerror = (error) => {
-      console.error('WebSocket Error:', error);
-    };
+    // 소켓은 토큰 재발급을 하지 않으므로, 만료된 토큰이면 재발급해 주는 REST 요청(기록 조회)이 끝난 뒤 연결
+    apiClient.get(`/api/chat/history/${rentalId}`)
+      .then(history => setMessages(history))
+      .catch(err => console.error("Failed to fetch chat history:", err))
+      .finally(() => {
+        if (!cancelled) connect();
+      });
 
     return () => {
-      ws.close();
+      cancelled = true;
+      if (ws) ws.close();
     };
   }, [rentalId, userId]);
 
@@ -107,14 +107,14 @@ export default function ChatWindow({ rentalId, userId, onClose }) {
           <div key={msg.id || idx} className={`flex ${msg.sender_id === userId ? 'justify-end' : 'justify-start'}`}>
             <div className="flex items-end gap-2 max-w-[80%]">
               {msg.sender_id !== userId && (
-                 <div className="w-8 h-8 rounded-full bg-gray-300 flex items-center justify-center text-sm font-bold shrink-0">{msg.sender?.name?.[0] || 'U'}</div>
+                 <div className="w-8 h-8 rounded-full bg-gray-300 flex items-center justify-center text-sm font-bold shrink-0">{(msg.sender?.name ?? msg.sender_name)?.[0] || 'U'}</div>
               )}
               <div className={`p-3 rounded-2xl text-sm ${
                 msg.sender_id === userId 
                   ? 'bg-purple-600 text-white rounded-br-none' 
                   : 'bg-white text-gray-800 border border-gray-200 rounded-bl-none shadow-sm'
               }`}>
-                <div className="font-bold mb-1">{msg.sender?.name}</div>
+                <div className="font-bold mb-1">{msg.sender?.name ?? msg.sender_name}</div>
                 <p>{msg.message}</p>
                 <div className="text-xs text-right mt-1 opacity-70">{new Date(msg.timestamp).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })}</div>
               </div>